@@ -0,0 +1,104 @@
+"""
+Compares uploading a backlog of todos one request per todo against the TodoAPIViewSet bulk call.
+
+Start a deployment (e.g. ``gunicorn todoapp.wsgi --workers 4 --bind 127.0.0.1:8000``) and point this script at the
+todos endpoint with the token of a throwaway user, every run adds its todos to that user:
+
+    python -m benchmarks.bulk_todos --token <key> --todos 1000 --batch-size 500 http://127.0.0.1:8000/api/todos/todos/
+
+create    one POST todos/ per todo against POST todos/bulk/ with ``--batch-size`` todos per call
+complete  one PATCH todos/<id>/ per todo against POST todos/bulk/ with ``--batch-size`` {id, done} patches per call
+
+Both run over a single keep-alive connection. Needs only the standard library, and no Django setup.
+"""
+import argparse
+import http.client
+import json
+import time
+from urllib.parse import urlsplit
+
+
+class Client(object):
+
+    def __init__(self, url, token):
+        parts = urlsplit(url)
+        self.path = parts.path.rstrip('/') + '/'
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+        self.headers = {'Authorization': 'Token ' + token, 'Content-Type': 'application/json'}
+
+    def request(self, method, path, payload):
+        self.connection.request(method, self.path + path, body=json.dumps(payload), headers=self.headers)
+        response = self.connection.getresponse()
+        body = response.read()
+        if response.status not in (200, 201):
+            raise SystemExit('{} {} failed with {}: {}'.format(method, self.path + path, response.status, body[:200]))
+        return json.loads(body)
+
+    def close(self):
+        self.connection.close()
+
+
+def batches(items, batch_size):
+    return [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+
+
+def create_single(client, names, batch_size):
+    for name in names:
+        client.request('POST', '', {'name': name})
+
+
+def create_bulk(client, names, batch_size):
+    ids = []
+    for batch in batches(names, batch_size):
+        created = client.request('POST', 'bulk/', {'create': [{'name': name} for name in batch]})['create']
+        ids.extend(todo['id'] for todo in created)
+    return ids
+
+
+def complete_single(client, ids, batch_size):
+    for pk in ids:
+        client.request('PATCH', '{}/'.format(pk), {'done': True})
+
+
+def complete_bulk(client, ids, batch_size, done=True):
+    for batch in batches(ids, batch_size):
+        client.request('POST', 'bulk/', {'update': [{'id': pk, 'done': done} for pk in batch]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url', help='todos endpoint, e.g. http://127.0.0.1:8000/api/todos/todos/')
+    parser.add_argument('--token', required=True)
+    parser.add_argument('--todos', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=500, help='todos per bulk call (max 1000)')
+    args = parser.parse_args()
+
+    client = Client(args.url, args.token)
+    names = ['Benchmark {}'.format(index) for index in range(args.todos)]
+    bulk_requests = len(batches(names, args.batch_size))
+
+    def timed(run, *run_args):
+        started = time.perf_counter()
+        result = run(client, *run_args, batch_size=args.batch_size)
+        return result, time.perf_counter() - started
+
+    rows = []
+    _, elapsed = timed(create_single, names)
+    rows.append(('create', 'single', args.todos, elapsed))
+    ids, elapsed = timed(create_bulk, names)
+    rows.append(('create', 'bulk', bulk_requests, elapsed))
+    # The single create endpoint does not return ids: both completions patch the todos of the bulk create.
+    _, elapsed = timed(complete_single, ids)
+    rows.append(('complete', 'single', args.todos, elapsed))
+    complete_bulk(client, ids, args.batch_size, done=False)
+    _, elapsed = timed(complete_bulk, ids)
+    rows.append(('complete', 'bulk', bulk_requests, elapsed))
+    client.close()
+
+    print('{:<10}{:<8}{:>10}{:>12}{:>14}'.format('phase', 'mode', 'requests', 'seconds', 'todos/sec'))
+    for phase, mode, requests, elapsed in rows:
+        print('{:<10}{:<8}{:>10}{:>12.2f}{:>14.0f}'.format(phase, mode, requests, elapsed, args.todos / elapsed))
+
+
+if __name__ == '__main__':
+    main()
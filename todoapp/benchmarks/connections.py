@@ -0,0 +1,90 @@
+"""
+Measures what connection handling costs the TodoAPIViewSet list, against the configured (local PostgreSQL) database:
+
+    DB_NAME=todoapp python -m benchmarks.connections --requests 2000
+
+Each mode runs in its own process with the settings environment of that mode:
+
+    per-request  DB_CONN_MAX_AGE=0, a new connection (TCP + authentication) for every request, the old default
+    persistent   DB_CONN_MAX_AGE=60, one connection per thread kept across requests
+    pooled       DB_POOL_MAX_SIZE=4, connections handed back to the process pool after each request
+
+Requests go through the Django test client, so the request_started/request_finished connection handling runs as it
+does behind a server. ``connects`` is the number of connections opened for the timed requests.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODES = (
+    ('per-request', {'DB_CONN_MAX_AGE': '0', 'DB_POOL_MAX_SIZE': '0'}),
+    ('persistent', {'DB_CONN_MAX_AGE': '60', 'DB_POOL_MAX_SIZE': '0'}),
+    ('pooled', {'DB_POOL_MAX_SIZE': '4'}),
+)
+
+
+def measure(requests):
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todoapp.settings')
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db.backends.signals import connection_created
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+
+    from todos.models import Todo
+
+    setup_test_environment()
+    user, created = get_user_model().objects.get_or_create(email='connections@benchmark.local')
+    if created:
+        Todo.objects.bulk_create([Todo(user=user, name='TODO - {}'.format(index)) for index in range(100)])
+    token, _created = Token.objects.get_or_create(user=user)
+
+    client = Client(HTTP_AUTHORIZATION='Token ' + token.key)
+    url = reverse('todos:todos-list')
+    client.get(url)
+
+    connects = []
+    connection_created.connect(lambda **kwargs: connects.append(1), weak=False)
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        assert client.get(url).status_code == 200
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        'connects': len(connects),
+        'mean': sum(timings) / len(timings) * 1000,
+        'p99': timings[int(len(timings) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.requests)))
+        return
+
+    print('{:<14}{:>10}{:>12}{:>12}'.format('mode', 'connects', 'mean (ms)', 'p99 (ms)'))
+    for name, env in MODES:
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'benchmarks.connections', '--child', '--requests', str(args.requests)],
+            env=dict(os.environ, **env),
+        )
+        result = json.loads(output.decode().splitlines()[-1])
+        print('{:<14}{connects:>10}{mean:>12.2f}{p99:>12.2f}'.format(name, **result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Compares requests/sec and latency percentiles of the WSGI and ASGI deployments of the todo list.
+
+Start both deployments against the same local PostgreSQL database, e.g.
+
+    gunicorn todoapp.wsgi --workers 4 --bind 127.0.0.1:8000
+    uvicorn todoapp.asgi:application --workers 4 --port 8001
+
+then point this script at them, once per endpoint pair (the sync view on WSGI, its async variant on ASGI):
+
+    python -m benchmarks.load_test --token <key> --duration 30 --concurrency 64 --slow-clients 32 \\
+        wsgi=http://127.0.0.1:8000/api/todos/todos/ asgi=http://127.0.0.1:8001/api/todos/async/todos/
+
+``--slow-clients`` keeps that many extra connections open, each trickling its request headers one byte per second:
+every one of them pins a sync worker for its whole lifetime, while the event loop only pays for an idle socket.
+Needs only the standard library, and no Django setup.
+"""
+import argparse
+import http.client
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def client(url, headers, deadline, latencies, errors):
+    parts = urlsplit(url)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            connection.close()
+            continue
+        if response.status == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(response.status)
+    connection.close()
+
+
+def slow_client(url, deadline):
+    parts = urlsplit(url)
+    try:
+        sock = socket.create_connection((parts.hostname, parts.port), timeout=30)
+    except OSError:
+        return
+    request = 'GET {} HTTP/1.1\r\nHost: {}\r\nX-Padding: {}\r\n\r\n'.format(parts.path, parts.netloc, 'x' * 60)
+    try:
+        for byte in request.encode('ascii'):
+            if time.perf_counter() >= deadline:
+                break
+            sock.send(bytes([byte]))
+            time.sleep(1)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def run(url, token, concurrency, slow_clients, duration):
+    headers = {'Authorization': 'Token ' + token} if token else {}
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], []
+    threads = [threading.Thread(target=slow_client, args=(url, deadline), daemon=True) for _ in range(slow_clients)]
+    threads += [
+        threading.Thread(target=client, args=(url, headers, deadline, latencies, errors)) for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads[slow_clients:]:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('targets', nargs='+', metavar='name=url')
+    parser.add_argument('--token', help='auth token of the user whose todos are listed')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    print('{:<8}{:>10}{:>8}{:>10}{:>10}{:>10}'.format('target', 'requests', 'errors', 'req/s', 'p50 (ms)', 'p99 (ms)'))
+    for target in args.targets:
+        name, _, url = target.partition('=')
+        result = run(url, args.token, args.concurrency, args.slow_clients, args.duration)
+        print('{:<8}{requests:>10}{errors:>8}{rps:>10.0f}{p50:>10.1f}{p99:>10.1f}'.format(name, **result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares the two fetch_user_wise_project_status strategies on a synthetic data set, against the configured database:
+
+    DB_NAME=todoapp python -m benchmarks.project_status --users 100000 --projects 10000 --members 10
+
+aggregate  filtered ARRAY_AGG per status, bucketed by the database (PostgreSQL only)
+group      one row per membership, bucketed in Python (the portable fallback)
+
+The data set is created inside a transaction which is rolled back at the end.
+"""
+import argparse
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todoapp.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, reset_queries, transaction  # noqa: E402
+
+from projects.models import Project, ProjectMember  # noqa: E402
+from todos.serializers import UserProjectStatusSerializer  # noqa: E402
+from todos.utils import aggregate_project_names, group_project_names  # noqa: E402
+
+BATCH_SIZE = 10000
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(users, projects, members):
+    User = get_user_model()
+    User.objects.bulk_create(
+        [User(email='status{}@benchmark.local'.format(index), first_name='User', last_name=str(index))
+         for index in range(users)],
+        batch_size=BATCH_SIZE,
+    )
+    Project.objects.bulk_create(
+        [Project(name='Project {}'.format(index), max_members=members, status=index % 3) for index in range(projects)],
+        batch_size=BATCH_SIZE,
+    )
+    user_ids = list(User.objects.values_list('id', flat=True))
+    memberships = [
+        ProjectMember(project_id=project_id, member_id=member_id)
+        for project_id in Project.objects.values_list('id', flat=True)
+        for member_id in random.sample(user_ids, min(members, len(user_ids)))
+    ]
+    ProjectMember.objects.bulk_create(memberships, batch_size=BATCH_SIZE)
+    return len(memberships)
+
+
+def measure(strategy, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        reset_queries()
+        started = time.perf_counter()
+        users = get_user_model().objects.only('first_name', 'last_name', 'email')
+        UserProjectStatusSerializer(strategy(users), many=True).data
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--projects', type=int, default=10000)
+    parser.add_argument('--members', type=int, default=10, help='members per project')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    strategies = [('group', group_project_names)]
+    if connection.vendor == 'postgresql':
+        strategies.insert(0, ('aggregate', aggregate_project_names))
+
+    try:
+        with transaction.atomic():
+            memberships = seed(args.users, args.projects, args.members)
+            print('{} users, {} projects, {} memberships'.format(args.users, args.projects, memberships))
+            print('{:<12}{:>12}'.format('strategy', 'best (ms)'))
+            for name, strategy in strategies:
+                print('{:<12}{:>12.1f}'.format(name, measure(strategy, args.repeat) * 1000))
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
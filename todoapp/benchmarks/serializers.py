@@ -0,0 +1,93 @@
+"""
+Compares the report serializers against the stock DRF ModelSerializer + json round-trip they replaced.
+
+Runs on in-memory model instances, no database needed:
+
+    python -m benchmarks.serializers --rows 20000
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todoapp.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework import serializers  # noqa: E402
+
+from todos.models import Todo  # noqa: E402
+from todos.serializers import TodoWithCreatorSerializer  # noqa: E402
+
+
+class ReferenceCreatorSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = get_user_model()
+        fields = ('first_name', 'last_name', 'email')
+
+
+class ReferenceTodoSerializer(serializers.ModelSerializer):
+    status = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField(source='date_created', format='%I:%M %p, %d %b, %Y')
+    creator = ReferenceCreatorSerializer(source='user')
+
+    class Meta:
+        model = Todo
+        fields = ('id', 'name', 'status', 'created_at', 'creator')
+
+    def get_status(self, todo):
+        return 'Done' if todo.done else 'To Do'
+
+
+def reference(todos):
+    return json.loads(json.dumps(ReferenceTodoSerializer(todos, many=True).data))
+
+
+def plain(todos):
+    return TodoWithCreatorSerializer(todos, many=True).data
+
+
+def measure(func, todos, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(todos)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(todos)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    users = [
+        get_user_model()(id=index, first_name='User', last_name=str(index), email='user{}@example.com'.format(index))
+        for index in range(100)
+    ]
+    now = timezone.now()
+    todos = [
+        Todo(id=index, user=users[index % 100], name='TODO - {}'.format(index), done=bool(index % 2), date_created=now)
+        for index in range(args.rows)
+    ]
+    assert reference(todos) == plain(todos)
+
+    print('{:<12}{:>12}{:>18}'.format('serializer', 'best (ms)', 'peak alloc (KiB)'))
+    for name, func in (('reference', reference), ('plain', plain)):
+        best, peak = measure(func, todos, args.repeat)
+        print('{:<12}{:>12.1f}{:>18.0f}'.format(name, best * 1000, peak / 1024))
+
+
+if __name__ == '__main__':
+    main()
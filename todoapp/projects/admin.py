@@ -1 +1,18 @@
 from django.contrib import admin
+
+from projects.models import Project, ProjectMember
+
+
+class ProjectAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "member_count", "max_members")
+    list_filter = ("status",)
+    readonly_fields = ("member_count",)
+
+
+class ProjectMemberAdmin(admin.ModelAdmin):
+    list_display = ("project", "member")
+    list_select_related = ("project", "member")
+
+
+admin.site.register(Project, ProjectAdmin)
+admin.site.register(ProjectMember, ProjectMemberAdmin)
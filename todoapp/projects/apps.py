@@ -6,3 +6,6 @@ from django.apps import AppConfig
 class ProjectConfig(AppConfig):
     name = 'projects'
     verbose_name = 'Projects sample application'
+
+    def ready(self):
+        from projects import signals  # noqa: F401
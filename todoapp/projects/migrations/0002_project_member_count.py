@@ -0,0 +1,30 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:22
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_member_count(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectMember = apps.get_model('projects', 'ProjectMember')
+    counts = ProjectMember.objects.filter(project=OuterRef('pk')).order_by().values('project').annotate(
+        count=Count('id')
+    ).values('count')
+    Project.objects.using(schema_editor.connection.alias).update(member_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_member_count, migrations.RunPython.noop),
+    ]
@@ -1,27 +1,196 @@
 
-from django.db import models
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, router, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Reverse, Upper
+
+from todoapp.report_cache import bump_generations
+
+
+class ProjectQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        # Bypasses model signals, keep the report cache generations in sync.
+        updated = super(ProjectQuerySet, self).update(**kwargs)
+        bump_generations([self.model], using=self.db)
+        return updated
+
+    def shift_member_counts(self, deltas):
+        """
+        Atomically adds the given (signed) deltas to ``member_count`` in a single UPDATE.
+        :param deltas: dict - project_id -> delta
+        """
+        deltas = {project_id: delta for project_id, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+        delta = Case(
+            *[When(pk=project_id, then=Value(delta)) for project_id, delta in deltas.items()],
+            default=Value(0), output_field=IntegerField(),
+        )
+        return self.filter(pk__in=deltas).update(member_count=F('member_count') + delta)
+
+    def refresh_member_counts(self):
+        """
+        Recomputes ``member_count`` of the projects in this queryset from the ProjectMember table.
+        """
+        counts = ProjectMember.objects.filter(project=OuterRef('pk')).order_by().values('project').annotate(
+            count=Count('id')
+        ).values('count')
+        return self.update(member_count=Coalesce(Subquery(counts), 0))
+
+    def with_member_name(self, startswith=None, endswith=None):
+        """
+        Projects having a member whose name starts with ``startswith`` or ends with ``endswith``, compared
+        case-insensitively: the prefix is matched against first names and the suffix against last names. Both are
+        prefix searches on the functional indexes of CustomUser (a suffix is a prefix of the reversed last name),
+        and the projects are matched with a semi-join, so each appears once without DISTINCT.
+        :param startswith: string - Optional name prefix
+        :param endswith: string - Optional name suffix
+        """
+        condition = Q()
+        if startswith:
+            condition |= Q(first_name_upper__startswith=startswith.upper())
+        if endswith:
+            condition |= Q(last_name_upper_reversed__startswith=endswith.upper()[::-1])
+        if not condition:
+            return self.none()
+
+        members = get_user_model().objects.alias(
+            first_name_upper=Upper('first_name'), last_name_upper_reversed=Reverse(Upper('last_name')),
+        ).filter(condition)
+        return self.filter(pk__in=ProjectMember.objects.filter(member__in=members).values('project_id'))
 
 
 class Project(models.Model):
     """
-        Needed fields
-        - members (m2m field to CustomUser; create through table and enforce unique constraint for user and project)
-        - name (max_length=100)
-        - max_members (positive int)
-        - status (choice field integer type :- 0(To be started)/1(In progress)/2(Completed), with default value been 0)
+    A project with a capped number of members (``max_members``).
+    ``member_count`` is a denormalized count of its ProjectMember rows, kept in sync by ProjectMember writes.
+    """
+    TO_BE_STARTED = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+    STATUS_CHOICES = (
+        (TO_BE_STARTED, 'To be started'),
+        (IN_PROGRESS, 'In progress'),
+        (COMPLETED, 'Completed'),
+    )
+
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, through='ProjectMember', related_name='projects')
+    name = models.CharField(max_length=100)
+    max_members = models.PositiveIntegerField()
+    status = models.IntegerField(choices=STATUS_CHOICES, default=TO_BE_STARTED)
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
 
-        Add string representation for this model with project name.
+class ProjectMemberQuerySet(models.QuerySet):
     """
+    Keeps Project.member_count (and the report cache generations) in sync for the bulk write paths (also used by
+    ``project.members.add/remove``).
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+            # Inserted rows are unknown, recount instead.
+            with transaction.atomic(using=self.db):
+                created = super(ProjectMemberQuerySet, self).bulk_create(objs, *args, **kwargs)
+                Project.objects.using(self.db).filter(pk__in={obj.project_id for obj in objs}).refresh_member_counts()
+                bump_generations([self.model], using=self.db)
+            return created
+
+        with transaction.atomic(using=self.db):
+            created = super(ProjectMemberQuerySet, self).bulk_create(objs, *args, **kwargs)
+            Project.objects.using(self.db).shift_member_counts(Counter(obj.project_id for obj in objs))
+            bump_generations([self.model], using=self.db)
+        for obj in objs:
+            obj._loaded_project_id = obj.project_id
+        return created
+
+    def update(self, **kwargs):
+        if not {'project', 'project_id'} & set(kwargs):
+            updated = super(ProjectMemberQuerySet, self).update(**kwargs)
+            bump_generations([self.model], using=self.db)
+            return updated
+
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            project_ids = set(self.values_list('project_id', flat=True).distinct())
+            updated = super(ProjectMemberQuerySet, self).update(**kwargs)
+            project_ids.update(
+                ProjectMember.objects.using(self.db).filter(pk__in=pks).values_list('project_id', flat=True)
+            )
+            Project.objects.using(self.db).filter(pk__in=project_ids).refresh_member_counts()
+            bump_generations([self.model], using=self.db)
+        return updated
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            removed = Counter(dict(
+                self.order_by().values('project_id').annotate(count=Count('id')).values_list('project_id', 'count')
+            ))
+            deleted = super(ProjectMemberQuerySet, self).delete()
+            Project.objects.using(self.db).shift_member_counts({
+                project_id: -count for project_id, count in removed.items()
+            })
+            bump_generations([self.model], using=self.db)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class ProjectMember(models.Model):
     """
-    Needed fields
-    - project (fk to Project model)
-    - member (fk to User model - use AUTH_USER_MODEL from settings)
-    - Add unique constraints
-
-    Add string representation for this model with project name and user email/first name.
+    Through table between Project and its member users.
     """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    member = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+    objects = ProjectMemberQuerySet.as_manager()
+
+    # project_id as last read from / written to the database, used to move member counts.
+    _loaded_project_id = None
+
+    class Meta:
+        unique_together = ('project', 'member')
+
+    def __str__(self):
+        return '{} - {}'.format(self.project.name, self.member.first_name or self.member.email)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(ProjectMember, cls).from_db(db, field_names, values)
+        if 'project_id' in field_names:
+            instance._loaded_project_id = instance.project_id
+        return instance
 
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(ProjectMember, instance=self)
+        adding = self._state.adding
+        with transaction.atomic(using=using):
+            super(ProjectMember, self).save(*args, **kwargs)
+            projects = Project.objects.using(using)
+            if adding:
+                projects.shift_member_counts({self.project_id: 1})
+            elif self._loaded_project_id is None:
+                # Previous project unknown, recount this one.
+                projects.filter(pk=self.project_id).refresh_member_counts()
+            elif self._loaded_project_id != self.project_id:
+                projects.shift_member_counts({self._loaded_project_id: -1, self.project_id: 1})
+        self._loaded_project_id = self.project_id
 
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(ProjectMember, instance=self)
+        with transaction.atomic(using=using):
+            deleted = super(ProjectMember, self).delete(using=using, keep_parents=keep_parents)
+            Project.objects.using(using).shift_member_counts({self._loaded_project_id or self.project_id: -1})
+            bump_generations([ProjectMember], using=using)
+        return deleted
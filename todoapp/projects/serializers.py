@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+
+class ProjectMemberSerializer(serializers.Serializer):
+    """
+    Validates the ``{ user_ids: [1,2,...n] }`` payload of the project member add/remove calls.
+    """
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_user_ids(self, user_ids):
+        # Drop duplicates, keeping the requested order for the logs.
+        return list(dict.fromkeys(user_ids))
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from projects.models import Project, ProjectMember
+
+
+@receiver(post_save, sender=ProjectMember)
+def refresh_member_count_on_raw_save(sender, instance, raw, using, **kwargs):
+    # Fixture loading bypasses ProjectMember.save(); recount so reloading a dump is idempotent.
+    if raw:
+        Project.objects.using(using).filter(pk=instance.project_id).refresh_member_counts()
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def release_memberships_on_user_delete(sender, instance, using, **kwargs):
+    # Memberships of a deleted user are removed by the FK cascade, which bypasses ProjectMember.delete().
+    Project.objects.using(using).filter(projectmember__member=instance).update(member_count=F('member_count') - 1)
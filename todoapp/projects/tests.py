@@ -0,0 +1,234 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient, APITestCase
+
+from projects.models import Project, ProjectMember
+from todoapp.testing import QueryBudgetTestMixin
+
+
+class ProjectMemberApiViewSetTestCase(QueryBudgetTestMixin, APITestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = User.objects.bulk_create([User(email='member{}@example.com'.format(index)) for index in range(6)])
+        self.project = Project.objects.create(name='Project A', max_members=3)
+        self.other_projects = [Project.objects.create(name='Project {}'.format(name), max_members=5) for name in 'BC']
+        self.client.force_authenticate(self.users[0])
+
+    def add(self, user_ids, project=None):
+        url = reverse('projects:projects-add', args=[(project or self.project).pk])
+        return self.client.post(url, {'user_ids': user_ids})
+
+    def remove(self, user_ids, project=None):
+        url = reverse('projects:projects-remove', args=[(project or self.project).pk])
+        return self.client.post(url, {'user_ids': user_ids})
+
+    def test_add_members(self):
+        busy_user, member = self.users[1], self.users[2]
+        ProjectMember.objects.bulk_create([
+            ProjectMember(project=self.other_projects[0], member=busy_user),
+            ProjectMember(project=self.other_projects[1], member=busy_user),
+            ProjectMember(project=self.project, member=member),
+        ])
+
+        user_ids = [busy_user.pk, member.pk, self.users[3].pk, self.users[4].pk, self.users[5].pk, 999]
+        response = self.add(user_ids)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.json()['logs'], {
+            str(busy_user.pk): 'Cannot add as User is a member in two projects',
+            str(member.pk): 'User is already a Member',
+            str(self.users[3].pk): 'Member added Successfully',
+            str(self.users[4].pk): 'Member added Successfully',
+            str(self.users[5].pk): 'Cannot add as Project has reached its maximum members',
+            '999': 'User does not exist',
+        })
+        self.assertEqual(self.project.members.count(), 3)
+
+    def test_remove_members(self):
+        member = self.users[1]
+        ProjectMember.objects.create(project=self.project, member=member)
+
+        response = self.remove([member.pk, self.users[2].pk, 999])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.json()['logs'], {
+            str(member.pk): 'Member removed Successfully',
+            str(self.users[2].pk): 'User is not a Member',
+            '999': 'User does not exist',
+        })
+        self.assertFalse(self.project.members.exists())
+
+    def test_invalid_payload(self):
+        self.assertEqual(400, self.add([]).status_code)
+        self.assertEqual(400, self.add(['abc']).status_code)
+        self.assertEqual(404, self.add([self.users[1].pk], project=Project(pk=999)).status_code)
+
+    def test_query_count_independent_of_batch_size(self):
+        big_project = Project.objects.create(name='Project D', max_members=500)
+        User = get_user_model()
+        many_users = User.objects.bulk_create([User(email='bulk{}@example.com'.format(index)) for index in range(300)])
+
+        counts = []
+        for users in (self.users[1:2], many_users):
+            user_ids = [user.pk for user in users]
+            with CaptureQueriesContext(connection) as add_queries:
+                self.assertEqual(200, self.add(user_ids, project=big_project).status_code)
+            with CaptureQueriesContext(connection) as remove_queries:
+                self.assertEqual(200, self.remove(user_ids, project=big_project).status_code)
+            counts.append((len(add_queries), len(remove_queries)))
+        self.assertEqual(counts[0], counts[1])
+
+
+class ProjectMemberCountTestCase(APITestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = User.objects.bulk_create([User(email='counted{}@example.com'.format(index)) for index in range(4)])
+        self.project = Project.objects.create(name='Project A', max_members=5)
+        self.other_project = Project.objects.create(name='Project B', max_members=5)
+
+    def assertMemberCount(self, project, expected):
+        project.refresh_from_db()
+        self.assertEqual(project.member_count, expected)
+        self.assertEqual(project.members.count(), expected)
+
+    def test_single_writes(self):
+        membership = ProjectMember.objects.create(project=self.project, member=self.users[0])
+        self.assertMemberCount(self.project, 1)
+
+        membership.project = self.other_project
+        membership.save()
+        self.assertMemberCount(self.project, 0)
+        self.assertMemberCount(self.other_project, 1)
+
+        membership.delete()
+        self.assertMemberCount(self.other_project, 0)
+
+    def test_bulk_and_related_manager_writes(self):
+        ProjectMember.objects.bulk_create([ProjectMember(project=self.project, member=user) for user in self.users])
+        self.assertMemberCount(self.project, 4)
+
+        self.other_project.members.add(*self.users[:2])
+        self.assertMemberCount(self.other_project, 2)
+
+        self.project.members.remove(self.users[0])
+        self.assertMemberCount(self.project, 3)
+
+        ProjectMember.objects.filter(member=self.users[1]).delete()
+        self.assertMemberCount(self.project, 2)
+        self.assertMemberCount(self.other_project, 1)
+
+        ProjectMember.objects.filter(project=self.project).update(project=self.other_project)
+        self.assertMemberCount(self.project, 0)
+        self.assertMemberCount(self.other_project, 3)
+
+    def test_user_deletion(self):
+        self.project.members.add(*self.users)
+        self.users[0].delete()
+        self.assertMemberCount(self.project, 3)
+
+
+class ProjectMemberNameSearchTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        names = [('Alma', 'Costa'), ('Bruno', 'Silva'), ('andre', 'Lopes'), ('Carla', 'Neves')]
+        cls.users = [
+            User.objects.create(email='search{}@example.com'.format(index), first_name=first_name, last_name=last_name)
+            for index, (first_name, last_name) in enumerate(names)
+        ]
+        cls.projects = [Project.objects.create(name='Project {}'.format(index), max_members=5) for index in range(4)]
+        for project, members in zip(cls.projects, [[0, 2], [1], [3], []]):
+            ProjectMember.objects.bulk_create([
+                ProjectMember(project=project, member=cls.users[index]) for index in members
+            ])
+
+    def search(self, **kwargs):
+        return sorted(Project.objects.with_member_name(**kwargs).values_list('name', flat=True))
+
+    def test_prefix_and_suffix(self):
+        self.assertEqual(['Project 0'], self.search(startswith='A'))
+        self.assertEqual(['Project 0', 'Project 1'], self.search(endswith='A'))
+        self.assertEqual(['Project 1', 'Project 2'], self.search(startswith='c', endswith='va'))
+        self.assertEqual([], self.search(startswith='x'))
+        self.assertEqual([], self.search())
+
+    def test_projects_are_not_repeated(self):
+        # Both members of Project 0 match.
+        with self.assertNumQueries(1):
+            self.assertEqual(['Project 0'], self.search(startswith='a'))
+
+    def test_like_wildcards_are_literal(self):
+        self.assertEqual([], self.search(startswith='%'))
+        self.assertEqual([], self.search(endswith='_a'))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Planner assertions target PostgreSQL.')
+class ProjectMemberNameIndexUsageTest(TestCase):
+    """
+    Seeds 100k users and asserts member name searches are answered by the functional indexes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO users_customuser (password, is_superuser, first_name, last_name, email, is_staff, "
+                "is_active, date_joined) "
+                "SELECT '', false, md5(s::text), md5((s + 1)::text), 'user' || s || '@example.com', false, true, now() "
+                "FROM generate_series(1, 100000) AS s"
+            )
+            cursor.execute('ANALYZE users_customuser')
+
+    def test_search_uses_the_name_indexes(self):
+        plan = Project.objects.with_member_name(startswith='abc', endswith='abc').explain()
+        self.assertIn('user_first_name_upper_idx', plan)
+        self.assertIn('user_last_name_upper_rev_idx', plan)
+        self.assertNotIn('Seq Scan on users_customuser', plan)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Row locking needs a real PostgreSQL server.')
+class ProjectMemberConcurrencyTestCase(TransactionTestCase):
+    """
+    Fires hundreds of parallel add/remove calls and checks the membership limits are never exceeded.
+    """
+    requests_count = 400
+    workers = 32
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = User.objects.bulk_create([User(email='racer{}@example.com'.format(index)) for index in range(60)])
+        self.projects = Project.objects.bulk_create(
+            [Project(name='Project {}'.format(index), max_members=3) for index in range(15)]
+        )
+
+    def call(self, seed):
+        rand = random.Random(seed)
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        project = rand.choice(self.projects)
+        user_ids = [user.pk for user in rand.sample(self.users, rand.randint(1, 5))]
+        action = 'projects:projects-remove' if rand.random() < 0.2 else 'projects:projects-add'
+        try:
+            return client.post(reverse(action, args=[project.pk]), {'user_ids': user_ids}).status_code
+        finally:
+            connections.close_all()
+
+    def test_parallel_adds_keep_invariants(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            statuses = list(executor.map(self.call, range(self.requests_count)))
+        self.assertEqual(set(statuses), {200})
+
+        for project in Project.objects.annotate(count=Count('members')):
+            self.assertLessEqual(project.count, project.max_members, msg=project.name)
+        for user in get_user_model().objects.annotate(count=Count('projects')):
+            self.assertLessEqual(user.count, 2, msg=user.email)
@@ -0,0 +1,11 @@
+from rest_framework import routers
+
+from projects.views import ProjectMemberApiViewSet
+
+app_name = 'projects'
+
+router = routers.SimpleRouter()
+
+router.register(r'projects', ProjectMemberApiViewSet, 'projects')
+
+urlpatterns = router.urls
@@ -1,4 +1,26 @@
-class ProjectMemberApiViewSet():
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from projects.models import Project, ProjectMember
+from projects.serializers import ProjectMemberSerializer
+
+MAX_PROJECTS_PER_USER = 2
+
+MEMBER_ADDED = 'Member added Successfully'
+ALREADY_MEMBER = 'User is already a Member'
+MAX_PROJECTS_REACHED = 'Cannot add as User is a member in two projects'
+PROJECT_FULL = 'Cannot add as Project has reached its maximum members'
+MEMBER_REMOVED = 'Member removed Successfully'
+NOT_A_MEMBER = 'User is not a Member'
+USER_NOT_FOUND = 'User does not exist'
+
+
+class ProjectMemberApiViewSet(GenericViewSet):
     """
        constraints
         - a user can be a member of max 2 projects only
@@ -18,8 +40,8 @@ class ProjectMemberApiViewSet():
          case1: if user is added successfully then - "Member added Successfully"
          case2: if user is already a member then - "User is already a Member"
          case3: if user is already added to 2 projects - "Cannot add as User is a member in two projects"
-
-         there will be many other cases think of that
+         case4: if project has no room left - "Cannot add as Project has reached its maximum members"
+         case5: if user id is unknown - "User does not exist"
 
        - update to remove users from projects
 
@@ -32,6 +54,104 @@ class ProjectMemberApiViewSet():
              <user_id>: <status messages>
            }
          }
+         following are the possible status messages
+         case1: if user is removed successfully then - "Member removed Successfully"
+         case2: if user is not a member then - "User is not a Member"
+         case3: if user id is unknown - "User does not exist"
+
+       A whole batch is validated with a fixed number of queries: the locked project row (carrying its member count),
+       one fetch of the membership counts of all requested users and one bulk insert/delete.
+
+       Admission is race free under concurrent requests: the project row is locked first (serializing additions to
+       the same project against max_members), then the requested user rows are locked in id order (serializing
+       additions of the same user to different projects against the 2 projects limit). Only the rows involved
+       are locked, and the consistent lock order keeps concurrent batches from deadlocking.
+    """
+    queryset = Project.objects.all()
+    serializer_class = ProjectMemberSerializer
+
+    def get_locked_project(self):
+        """
+        Fetches the project with a row lock (SELECT ... FOR UPDATE), must be called inside a transaction.
+        """
+        project = get_object_or_404(self.get_queryset().select_for_update(), pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, project)
+        return project
+
+    def get_user_ids(self):
+        serializer = self.get_serializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['user_ids']
+
+    @staticmethod
+    def lock_users(user_ids):
+        """
+        Locks the requested user rows in id order, must be called inside a transaction.
+        """
+        return list(
+            get_user_model().objects.filter(id__in=user_ids).order_by('id').select_for_update()
+            .values_list('id', flat=True)
+        )
+
+    @staticmethod
+    def fetch_memberships(project, user_ids):
+        """
+        Fetches, in one query, how many projects each requested user is in and whether one of them is ``project``.
+        :return: dict - user_id -> (project_count, is_member) for the users that exist
+        """
+        rows = get_user_model().objects.filter(id__in=user_ids).annotate(
+            project_count=Count('projects'),
+            in_project=Count('projects', filter=Q(projects=project)),
+        ).order_by().values_list('id', 'project_count', 'in_project')
+        return {user_id: (project_count, bool(in_project)) for user_id, project_count, in_project in rows}
+
+    @action(detail=True, methods=['post'])
+    def add(self, request, *args, **kwargs):
+        user_ids = self.get_user_ids()
+        logs = {}
+        with transaction.atomic():
+            project = self.get_locked_project()
+            # Memberships must be read after the user locks are held to see competing commits.
+            self.lock_users(user_ids)
+            memberships = self.fetch_memberships(project, user_ids)
+            available = project.max_members - project.member_count
+
+            new_members = []
+            for user_id in user_ids:
+                if user_id not in memberships:
+                    logs[user_id] = USER_NOT_FOUND
+                    continue
+                project_count, is_member = memberships[user_id]
+                if is_member:
+                    logs[user_id] = ALREADY_MEMBER
+                elif project_count >= MAX_PROJECTS_PER_USER:
+                    logs[user_id] = MAX_PROJECTS_REACHED
+                elif available <= 0:
+                    logs[user_id] = PROJECT_FULL
+                else:
+                    new_members.append(ProjectMember(project=project, member_id=user_id))
+                    logs[user_id] = MEMBER_ADDED
+                    available -= 1
+            ProjectMember.objects.bulk_create(new_members, batch_size=1000)
+        return Response({'logs': logs})
+
+    @action(detail=True, methods=['post'])
+    def remove(self, request, *args, **kwargs):
+        user_ids = self.get_user_ids()
+        logs = {}
+        with transaction.atomic():
+            project = self.get_locked_project()
+            memberships = self.fetch_memberships(project, user_ids)
 
-         there will be many other cases think of that and share on forum
-    """
\ No newline at end of file
+            removed_ids = []
+            for user_id in user_ids:
+                if user_id not in memberships:
+                    logs[user_id] = USER_NOT_FOUND
+                elif not memberships[user_id][1]:
+                    logs[user_id] = NOT_A_MEMBER
+                else:
+                    removed_ids.append(user_id)
+                    logs[user_id] = MEMBER_REMOVED
+            if removed_ids:
+                ProjectMember.objects.filter(project=project, member_id__in=removed_ids).delete()
+        return Response({'logs': logs})
@@ -0,0 +1,18 @@
+"""
+ASGI config for todoapp project.
+
+It exposes the ASGI callable as a module-level variable named ``application``. Serve it with an ASGI server, e.g.
+
+    uvicorn todoapp.asgi:application --workers 4
+
+Only the async views (see todoapp/async_views.py) free the event loop while waiting on the database or a slow
+client; the synchronous DRF views run in a thread pool.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todoapp.settings")
+
+application = get_asgi_application()
@@ -0,0 +1,80 @@
+"""
+Minimal async counterpart of DRF's APIView.
+
+DRF (3.15) has no async views: its request wrapping, authentication, permissions and exception handling are all
+synchronous, so under ASGI each DRF request occupies a thread for its whole lifetime, including while a slow client
+is sending the body or reading the response. Views built on AsyncAPIView run on the event loop, only hopping to a
+thread for the database calls of the async ORM.
+
+What is covered: token authentication (authenticators with an ``aauthenticate`` method, e.g.
+CachedTokenAuthentication), an authenticated-only switch, JSON bodies and DRF exceptions rendered as DRF would
+render them. Anything else (throttling, content negotiation, browsable API) needs a regular DRF view.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+
+class AsyncAPIView(View):
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    requires_authentication = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super(AsyncAPIView, cls).as_view(**initkwargs)
+        # Token authenticated, no session: exempt from CSRF like APIView.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await self.perform_authentication(request)
+            return await super(AsyncAPIView, self).dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    def get_authenticators(self):
+        return [auth() for auth in self.authentication_classes]
+
+    async def perform_authentication(self, request):
+        request.user, request.auth = AnonymousUser(), None
+        for authenticator in self.get_authenticators():
+            if hasattr(authenticator, 'aauthenticate'):
+                user_auth = await authenticator.aauthenticate(request)
+            else:
+                user_auth = await sync_to_async(authenticator.authenticate)(request)
+            if user_auth is not None:
+                request.user, request.auth = user_auth
+                break
+        if self.requires_authentication and not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    def handle_exception(self, exc):
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.get_authenticators()
+            if authenticators:
+                headers['WWW-Authenticate'] = authenticators[0].authenticate_header(self.request)
+            else:
+                exc.status_code = 403
+
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return JsonResponse(data, status=exc.status_code, headers=headers, safe=False)
+
+    @staticmethod
+    def get_data(request):
+        """
+        Request body, as JSON or form data.
+        """
+        if request.content_type != 'application/json':
+            return request.POST
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError as exc:
+            raise exceptions.ParseError(_('JSON parse error - {}').format(exc))
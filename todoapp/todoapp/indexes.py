@@ -0,0 +1,18 @@
+from django.contrib.postgres.indexes import OpClass
+from django.db import models
+
+
+class PatternOpsIndex(models.Index):
+    """
+    Functional B-tree index usable by ``LIKE 'prefix%'`` lookups (``startswith`` on the indexed expression).
+    PostgreSQL only uses a B-tree for LIKE under the C collation, or with a ``*_pattern_ops`` operator class, which
+    is added to every expression there. Other databases get the plain functional index.
+    """
+    opclass_name = 'text_pattern_ops'
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        index = self
+        if schema_editor.connection.vendor == 'postgresql':
+            index = self.clone()
+            index.expressions = tuple(OpClass(expression, self.opclass_name) for expression in self.expressions)
+        return super(PatternOpsIndex, index).create_sql(model, schema_editor, using=using, **kwargs)
@@ -0,0 +1,168 @@
+"""
+Request level query budget.
+
+Every request is measured on all configured database aliases: the number of SQL statements and the time spent in
+the database. Both are exposed in a ``Server-Timing`` header (so DB cost shows up in the browser dev tools and load
+balancer logs) and checked against the per view budgets of ``settings.QUERY_BUDGETS``:
+
+    QUERY_BUDGETS = {
+        'GET todos:todos-list': 2,  # method specific budget
+        'todos:todos-detail': 7,    # any other method
+    }
+
+A request over budget logs a warning, or raises QueryBudgetExceeded when ``settings.QUERY_BUDGET_RAISE`` is set
+(see QueryBudgetTestMixin), so N+1 regressions fail the test suite.
+"""
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from todoapp.routers import PIN_COOKIE, routing_scope
+
+logger = logging.getLogger(__name__)
+
+# Recorder of the request being served. A context variable rather than a per connection execute_wrapper() block:
+# connections are thread local, and async views run their queries on sync_to_async threads, which inherit the
+# request's context.
+_current_recorder = ContextVar('query_budget_recorder', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder(object):
+    """
+    Counts statements and the time spent running them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorders():
+    """
+    Installs record_query on this thread's connections. Connections opened later get it through connection_created;
+    this covers the ones opened before this module was imported (e.g. the test database connection).
+    """
+    for alias in settings.DATABASES:
+        install_query_recorder(connections[alias])
+
+
+connection_created.connect(install_query_recorder)
+
+
+class QueryBudgetMiddleware(object):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        install_query_recorders()
+        recorder, started = QueryRecorder(), time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.process_response(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder, started = QueryRecorder(), time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.process_response(request, response, recorder, started)
+
+    def process_response(self, request, response, recorder, started):
+        total = time.perf_counter() - started
+        response['Server-Timing'] = 'db;desc="{} queries";dur={:.2f}, total;dur={:.2f}'.format(
+            recorder.count, recorder.duration * 1000, total * 1000
+        )
+        self.check_budget(request, recorder)
+        return response
+
+    @staticmethod
+    def check_budget(request, recorder):
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        budget = budgets.get('{} {}'.format(request.method, view_name), budgets.get(view_name))
+        if budget is None or recorder.count <= budget:
+            return
+
+        message = '{} {} ({}) ran {} queries in {:.2f}ms, budget is {}'.format(
+            request.method, request.path, view_name, recorder.count, recorder.duration * 1000, budget
+        )
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaPinningMiddleware(object):
+    """
+    Gives every request its own replica routing state (see todoapp/routers.py): unsafe methods and clients holding
+    the pinning cookie read from the primary, and requests which wrote set the cookie for REPLICA_PIN_SECONDS.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_scope(self.is_pinned(request)) as state:
+            response = self.get_response(request)
+        return self.process_response(response, state)
+
+    async def __acall__(self, request):
+        with routing_scope(self.is_pinned(request)) as state:
+            response = await self.get_response(request)
+        return self.process_response(response, state)
+
+    def is_pinned(self, request):
+        return request.method not in self.safe_methods or PIN_COOKIE in request.COOKIES
+
+    @staticmethod
+    def process_response(response, state):
+        if state.wrote:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        return response
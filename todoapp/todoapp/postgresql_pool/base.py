@@ -0,0 +1,206 @@
+"""
+PostgreSQL backend drawing its connections from a per process pool.
+
+Django 4.2 has no connection pool of its own (``OPTIONS['pool']`` arrived in 5.1) and psycopg2's ``pool`` module
+raises as soon as it is exhausted instead of waiting. With this backend, closing a connection (which Django does at
+the end of every request when CONN_MAX_AGE is 0) hands it back to the pool, and the next request of any thread picks
+it up again without a new TCP connection & authentication handshake:
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'todoapp.postgresql_pool',
+            ...
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': True,  # run SELECT 1 on connections taken out of the pool
+            'POOL': {
+                'MAX_SIZE': 10,       # open connections per process, checked out or idle
+                'TIMEOUT': 30,        # seconds to wait for a free connection
+                'MAX_LIFETIME': 600,  # seconds before a connection is closed instead of reused, None for no limit
+            },
+        },
+    }
+
+Pools are keyed by process, alias and connection parameters, so forked workers and the test database get their own.
+"""
+import collections
+import os
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.utils import OperationalError
+
+if is_psycopg3:
+    from psycopg.pq import TransactionStatus
+
+    TRANSACTION_STATUS_IDLE = TransactionStatus.IDLE
+else:
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+POOL_DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 30,
+    'MAX_LIFETIME': 600,
+}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool(object):
+    """
+    Bounded pool of open DB-API connections. getconn waits up to ``timeout`` seconds while ``max_size`` connections
+    are checked out. Connections are rolled back when returned and closed instead of reused once older than
+    ``max_lifetime``.
+    """
+
+    def __init__(self, max_size, timeout, max_lifetime):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = collections.deque()
+        self._created_at = {}
+
+    def getconn(self, connect, check=None):
+        """
+        Most recently returned idle connection, or a new one from ``connect()``.
+        :param connect: callable - opens a new connection
+        :param check: callable - optional health check of an idle connection, returns False when it is unusable
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout('No database connection available within {} seconds'.format(self.timeout))
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection = self._idle.pop()
+                if self.is_expired(connection) or (check is not None and not check(connection)):
+                    self.discard(connection)
+                    continue
+                return connection
+            connection = connect()
+            self._created_at[id(connection)] = time.monotonic()
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, discard=False):
+        """
+        Returns a connection taken with getconn, discard closes it instead of keeping it for reuse.
+        """
+        try:
+            if not discard and not connection.closed:
+                try:
+                    if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                        connection.rollback()
+                except Exception:
+                    discard = True
+            if discard or connection.closed:
+                self.discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    def is_expired(self, connection):
+        if connection.closed:
+            return True
+        if self.max_lifetime is None:
+            return False
+        return time.monotonic() - self._created_at.get(id(connection), 0) >= self.max_lifetime
+
+    def discard(self, connection):
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        Closes the idle connections; checked out ones are closed when returned.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, collections.deque()
+        for connection in idle:
+            self.discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params, options):
+    key = (os.getpid(), alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = dict(POOL_DEFAULTS, **options)
+            pool = _pools[key] = ConnectionPool(options['MAX_SIZE'], options['TIMEOUT'], options['MAX_LIFETIME'])
+        return pool
+
+
+def close_pools(alias=None):
+    """
+    Closes the idle connections of this process' pools, of every alias by default.
+    """
+    with _pools_lock:
+        pools = [pool for (pid, pool_alias, _), pool in _pools.items() if alias in (None, pool_alias)]
+    for pool in pools:
+        pool.close()
+
+
+def check_connection(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections to the test database would block DROP DATABASE.
+        close_pools(self.connection.alias)
+        super(DatabaseCreation, self)._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super(DatabaseWrapper, self).__init__(*args, **kwargs)
+        self.pool = None
+
+    def check_settings(self):
+        super(DatabaseWrapper, self).check_settings()
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured(
+                "Database '{}' is pooled, CONN_MAX_AGE must be 0 so that connections go back to the pool after "
+                "each request.".format(self.alias)
+            )
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, conn_params, self.settings_dict.get('POOL', {}))
+        check = check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+        # Reused connections keep the isolation level & adapters set up when they were opened.
+        connection = pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params), check)
+        self.pool = pool
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection, discard=self.errors_occurred)
+            # Back in the pool, another thread may take it over; see DatabaseWrapper.close.
+            self.connection = None
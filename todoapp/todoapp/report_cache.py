@@ -0,0 +1,153 @@
+"""
+Result cache of the report utils (todos/utils.py).
+
+``@cached_report(*models)`` stores a util's result in the ``settings.REPORT_CACHE['CACHE_ALIAS']`` cache, keyed by
+the util, its arguments, the active time zone (date bounds and datetimes are local) and the current *generation*
+of every model it reads. Writes never delete cached results,
+they bump the generation of the written model instead (``bump_generations``: post_save/post_delete receivers and
+the bulk write paths of the querysets), so the next call misses and recomputes.
+
+- Generations are bumped once the write commits. Bumping earlier would let a concurrent reader cache the pre-commit
+  state under the new generation.
+- Inside a transaction the utils bypass the cache: their results may depend on uncommitted writes.
+- Results read from a lagging replica right after a bump may be cached under the new generation; ``TIMEOUT`` bounds
+  how long they are served.
+
+The cache is off while CACHE_ALIAS is None. Use a cache shared by all workers (memcached/redis): a per process cache
+(e.g. locmem) only sees the bumps of its own process.
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+DEFAULTS = {
+    'CACHE_ALIAS': None,
+    'TIMEOUT': 300,
+}
+KEY_PREFIX = 'report:'
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses'))
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_cache_setting(name):
+    return getattr(settings, 'REPORT_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_report_cache():
+    alias = get_cache_setting('CACHE_ALIAS')
+    return caches[alias] if alias else None
+
+
+def model_label(model):
+    """
+    :param model: Model class or "app_label.ModelName" string
+    :return: string - Lower cased model label
+    """
+    return model.lower() if isinstance(model, str) else model._meta.label_lower
+
+
+def generation_key(label):
+    return '{}gen:{}'.format(KEY_PREFIX, label)
+
+
+def _bump(labels):
+    cache = get_report_cache()
+    if cache is None:
+        return
+    for label in labels:
+        key = generation_key(label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Missing or evicted, restart from the clock so that results cached under an older value are not reused.
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_generations(models, using=DEFAULT_DB_ALIAS):
+    """
+    Invalidates the cached results depending on the given models, once the current transaction on ``using``
+    commits (immediately in autocommit mode).
+    :param models: iterable - Model classes or labels which were written
+    :param using: string - Database alias written to
+    """
+    if get_cache_setting('CACHE_ALIAS') is None:
+        return
+    transaction.on_commit(functools.partial(_bump, [model_label(model) for model in models]), using=using)
+
+
+def _count(name, hit):
+    with _stats_lock:
+        hits, misses = _stats.get(name, (0, 0))
+        _stats[name] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+
+def report_cache_info():
+    """
+    Hit & miss counts of this process, by cached util.
+    :return: dict - util name -> CacheInfo
+    """
+    with _stats_lock:
+        return {name: CacheInfo(*counts) for name, counts in sorted(_stats.items())}
+
+
+def clear_report_cache_info():
+    with _stats_lock:
+        _stats.clear()
+
+
+def cached_report(*models):
+    """
+    Decorator caching a report util's result until one of ``models`` is written.
+    The wrapped util gets ``cache_info()`` (its CacheInfo) like ``functools.lru_cache``.
+    :param models: Model classes or labels the util reads
+    """
+    labels = [model_label(model) for model in models]
+
+    def decorator(func):
+        name = '{}.{}'.format(func.__module__, func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_report_cache()
+            if cache is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+                return func(*args, **kwargs)
+
+            generation_keys = [generation_key(label) for label in labels]
+            generations = cache.get_many(generation_keys)
+            missing = [key for key in generation_keys if key not in generations]
+            if missing:
+                now = time.time_ns()
+                for key in missing:
+                    # add() keeps a generation another process has just set.
+                    cache.add(key, now, timeout=None)
+                generations.update(cache.get_many(missing))
+
+            signature = repr((
+                name, [generations.get(key) for key in generation_keys], timezone.get_current_timezone_name(), args,
+                sorted(kwargs.items()),
+            ))
+            key = KEY_PREFIX + hashlib.sha1(signature.encode('utf-8')).hexdigest()
+            result = cache.get(key)
+            if result is not None:
+                _count(name, True)
+                return result
+
+            _count(name, False)
+            result = func(*args, **kwargs)
+            cache.set(key, result, timeout=get_cache_setting('TIMEOUT'))
+            return result
+
+        wrapper.cache_info = lambda: report_cache_info().get(name, CacheInfo(0, 0))
+        return wrapper
+
+    return decorator
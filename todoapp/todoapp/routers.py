@@ -0,0 +1,98 @@
+"""
+Read replica routing.
+
+Reads go to ``settings.REPLICA_DATABASE`` only inside a ``read_from_replica()`` block (a context manager and
+decorator wrapped around the report utils and list endpoints), everything else stays on the primary. A block reads
+from the primary anyway when
+
+- the primary is inside a transaction (the reads may depend on its uncommitted writes),
+- something was written in the same request, or
+- the client wrote less than ``settings.REPLICA_PIN_SECONDS`` ago: ReplicaPinningMiddleware sets a pinning cookie on
+  responses to requests which wrote, so the client reads its own writes while the replica catches up.
+
+Outside of requests a write pins the rest of the thread's context (e.g. a management command) to the primary; wrap
+the code in ``routing_scope()`` to scope it.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+PIN_COOKIE = 'pin_primary'
+
+_use_replica = ContextVar('use_replica', default=False)
+_routing_state = ContextVar('routing_state', default=None)
+
+
+class RoutingState(object):
+    """
+    Mutable, so writes made in sync_to_async threads (which run in a copy of the request's context) still pin.
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def read_from_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def routing_scope(pinned=False):
+    """
+    Fresh pinning state for the enclosed block.
+    :return: RoutingState
+    """
+    state = RoutingState(pinned)
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+def replica_or_primary(model):
+    """
+    Alias read_from_replica() would read model from, for querysets only evaluated after the block (e.g. streamed).
+    """
+    with read_from_replica():
+        return router.db_for_read(model)
+
+
+class ReplicaRouter(object):
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(settings, 'REPLICA_DATABASE', None)
+        if replica is None or not _use_replica.get():
+            return None
+        state = _routing_state.get()
+        if state is not None and (state.pinned or state.wrote):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is None:
+            state = RoutingState()
+            _routing_state.set(state)
+        state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema from the primary.
+        if db == getattr(settings, 'REPLICA_DATABASE', None):
+            return False
+        return None
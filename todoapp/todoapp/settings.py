@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework.authtoken',
@@ -49,7 +50,11 @@ INSTALLED_APPS = [
 ]
 AUTH_USER_MODEL = u'users.CustomUser'
 
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
 MIDDLEWARE = [
+    'todoapp.middleware.QueryBudgetMiddleware',
+    'todoapp.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,20 +90,48 @@ WSGI_APPLICATION = 'todoapp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/1.9/ref/settings/#databases
 
+# Connections are reused across requests, either
+# - pooled (DB_POOL_MAX_SIZE > 0): returned to a per process pool at the end of each request and shared by all
+#   threads, see todoapp/postgresql_pool/base.py. Size it so that workers * DB_POOL_MAX_SIZE stays below the
+#   server's max_connections.
+# - persistent (default): each worker thread keeps its own connection open for DB_CONN_MAX_AGE seconds.
+# Either way health checks (one SELECT 1 before reuse) keep a restarted server from failing the first request.
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))
+
 DATABASES = {
     u'default': {
-        u'ENGINE': u'django.db.backends.postgresql',
-        u'NAME': u'',                      # Add database name.
-        u'USER': u'postgres',              # Add psql user name. For default use postgres.
-        u'PASSWORD': u'',                  # Add user password if exists.
-        u'HOST': u'',                      # Set to empty string for localhost..
-        u'PORT': u'5432',                  # Psql service running port.
+        u'ENGINE': u'todoapp.postgresql_pool' if DB_POOL_MAX_SIZE else u'django.db.backends.postgresql',
+        u'NAME': os.environ.get('DB_NAME', u''),                # Add database name.
+        u'USER': os.environ.get('DB_USER', u'postgres'),        # Add psql user name. For default use postgres.
+        u'PASSWORD': os.environ.get('DB_PASSWORD', u''),        # Add user password if exists.
+        u'HOST': os.environ.get('DB_HOST', u''),                # Set to empty string for localhost..
+        u'PORT': os.environ.get('DB_PORT', u'5432'),            # Psql service running port.
+        u'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        u'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        u'POOL': {
+            u'MAX_SIZE': DB_POOL_MAX_SIZE,
+            u'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            u'MAX_LIFETIME': float(os.environ.get('DB_POOL_MAX_LIFETIME', 600)),
+        },
     },
 }
 
+# Read replica of the report utils & list endpoints, see todoapp/routers.py. Without DB_REPLICA_HOST the alias
+# points at the primary and nothing is routed to it; tests use it as a mirror of the test database.
+DATABASES[u'replica'] = dict(
+    DATABASES[u'default'],
+    HOST=os.environ.get('DB_REPLICA_HOST', DATABASES[u'default'][u'HOST']),
+    PORT=os.environ.get('DB_REPLICA_PORT', DATABASES[u'default'][u'PORT']),
+    TEST={u'MIRROR': u'default'},
+)
+REPLICA_DATABASE = u'replica' if os.environ.get('DB_REPLICA_HOST') else None
+# Seconds a client keeps reading from the primary after a write, should cover the replication lag.
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+DATABASE_ROUTERS = ['todoapp.routers.ReplicaRouter']
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -106,6 +139,68 @@ REST_FRAMEWORK = {
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
 }
 
+# token -> user cache of users.authentication.CachedTokenAuthentication. Set CACHE_ALIAS to a shared cache (e.g.
+# memcached/redis) for a second tier across workers. Keep TTL short: it bounds how long other workers may keep
+# accepting a deleted token or a deactivated user.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'CACHE_ALIAS': None,
+}
+
+# Result cache of the report utils (todos/utils.py), see todoapp/report_cache.py. Off unless REPORT_CACHE_ALIAS
+# names one of CACHES; it must be shared by all workers (memcached/redis), as writes invalidate it through counters
+# stored in it. TIMEOUT bounds how long a result read from a lagging replica may be served.
+REPORT_CACHE = {
+    'CACHE_ALIAS': os.environ.get('REPORT_CACHE_ALIAS') or None,
+    'TIMEOUT': int(os.environ.get('REPORT_CACHE_TIMEOUT', 300)),
+}
+
+# Days todo deletions are kept for the delta sync (TodoAPIViewSet sync), see purge_todo_tombstones. Clients which
+# did not sync for longer must sync from scratch.
+TODO_SYNC_TOMBSTONE_DAYS = int(os.environ.get('TODO_SYNC_TOMBSTONE_DAYS', 30))
+
+# Max SQL statements per request, by "<METHOD> <url name>" or "<url name>" (any method). Overruns log a warning,
+# or raise when QUERY_BUDGET_RAISE is set (tests). See todoapp/middleware.py.
+QUERY_BUDGETS = {
+    'GET todos:todos-list': 3,
+    'POST todos:todos-list': 7,
+    'GET todos:todos-detail': 3,
+    'todos:todos-detail': 7,
+    'todos:todos-bulk': 16,
+    'todos:todos-sync': 3,
+    'todos:async-todos-list': 2,
+    'todos:async-todos-detail': 2,
+    'users:register': 6,
+    'users:login': 7,
+    'users:async-login': 7,
+    'projects:projects-add': 10,
+    'projects:projects-remove': 10,
+}
+QUERY_BUDGET_RAISE = False
+
+
+AUTHENTICATION_BACKENDS = [
+    'users.backends.HashingPoolModelBackend',
+]
+
+# Password hashing
+# The first hasher hashes new passwords, the others verify existing ones (e.g. the pbkdf2_sha256 fixtures), which
+# are rehashed with the first hasher on the next successful login.
+PASSWORD_HASHERS = [
+    'users.hashers.TunableScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+# scrypt cost (N, r, p), memory use is ~128 * N * r bytes (16MiB by default). Changing it rehashes on login.
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.environ.get('PASSWORD_SCRYPT_PARALLELISM', 1))
+
+# Size of the thread pool password hashing runs in, i.e. max concurrent hashes per process.
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', os.cpu_count() or 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.9/ref/settings/#auth-password-validators
@@ -0,0 +1,54 @@
+import re
+
+from django.test import override_settings
+
+from todoapp.fixtures import load_fixture
+from todoapp.middleware import install_query_recorders
+
+SERVER_TIMING_DB = re.compile(r'db;desc="(?P<count>\d+) queries";dur=(?P<duration>[\d.]+)')
+
+
+class QueryBudgetTestMixin(object):
+    """
+    Test case mixin turning query budget overruns (settings.QUERY_BUDGETS) into test failures.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(QueryBudgetTestMixin, cls).setUpClass()
+        budget_settings = override_settings(QUERY_BUDGET_RAISE=True)
+        budget_settings.enable()
+        cls.addClassCleanup(budget_settings.disable)
+        # Async views run their queries on this thread's connections, which the async middleware path cannot reach.
+        install_query_recorders()
+
+    def assertQueryCount(self, response, expected):
+        """
+        Asserts the number of queries a request ran, as reported in its Server-Timing header.
+        """
+        match = SERVER_TIMING_DB.search(response['Server-Timing'])
+        self.assertIsNotNone(match, msg='No db metric in Server-Timing header')
+        self.assertEqual(int(match.group('count')), expected)
+
+
+class FastFixturesTestMixin(object):
+    """
+    TestCase mixin loading ``fast_fixtures`` with load_fixture (bulk inserts) instead of loaddata, once per class:
+    the class transaction rolls them back after its last test.
+    """
+    fast_fixtures = ()
+
+    @classmethod
+    def setUpTestData(cls):
+        super(FastFixturesTestMixin, cls).setUpTestData()
+        for using in cls._databases_names(include_mirrors=False):
+            for fixture in cls.fast_fixtures:
+                load_fixture(fixture, using=using)
+
+
+# Cheap hasher for tests which create and log in users; never use it outside tests. PBKDF2 only verifies the
+# fixture hashes.
+FAST_PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+]
@@ -0,0 +1,210 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient, APITestCase
+
+from projects.models import Project, ProjectMember
+from todoapp.fixtures import load_fixture
+from todoapp.middleware import QueryBudgetExceeded
+from todoapp.postgresql_pool.base import TRANSACTION_STATUS_IDLE, ConnectionPool, PoolTimeout
+from todoapp.routers import PIN_COOKIE, routing_scope
+from todos import utils as todos_utils
+from todos.models import Todo, UserTodoStats
+from todoapp.testing import QueryBudgetTestMixin
+
+
+class QueryBudgetMiddlewareTestCase(QueryBudgetTestMixin, APITestCase):
+    url = reverse('todos:todos-list')
+
+    def setUp(self):
+        self.client.force_authenticate(get_user_model().objects.create(email='budget@example.com'))
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertRegex(response['Server-Timing'], r'^db;desc="\d+ queries";dur=[\d.]+, total;dur=[\d.]+$')
+        # ETag validator + page.
+        self.assertQueryCount(response, 2)
+
+    @override_settings(QUERY_BUDGETS={'GET todos:todos-list': 0})
+    def test_budget_overrun_fails_in_tests(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(self.url)
+
+    @override_settings(QUERY_BUDGETS={'todos:todos-list': 0}, QUERY_BUDGET_RAISE=False)
+    def test_budget_overrun_warns_in_production(self):
+        with self.assertLogs('todoapp.middleware', 'WARNING') as logs:
+            response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertIn('(todos:todos-list) ran 2 queries', logs.output[0])
+
+
+class FakeConnection(object):
+
+    def __init__(self):
+        self.closed = 0
+        self.rolled_back = False
+        self.info = type('ConnectionInfo', (), {'transaction_status': TRANSACTION_STATUS_IDLE})()
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(max_size=2, timeout=0, max_lifetime=None)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        self.assertIs(connection, pool.getconn(FakeConnection))
+
+    def test_waits_for_a_free_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01, max_lifetime=None)
+        connection = pool.getconn(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        self.assertIs(connection, pool.getconn(FakeConnection))
+
+    def test_open_transaction_is_rolled_back(self):
+        pool = ConnectionPool(max_size=1, timeout=0, max_lifetime=None)
+        connection = pool.getconn(FakeConnection)
+        connection.info.transaction_status = TRANSACTION_STATUS_IDLE + 2
+        pool.putconn(connection)
+        self.assertTrue(connection.rolled_back)
+
+    def test_unusable_connections_are_replaced(self):
+        pool = ConnectionPool(max_size=1, timeout=0, max_lifetime=None)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        replacement = pool.getconn(FakeConnection, check=lambda connection: False)
+        self.assertIsNot(connection, replacement)
+        self.assertTrue(connection.closed)
+
+        pool.putconn(replacement, discard=True)
+        self.assertTrue(replacement.closed)
+        self.assertIsNot(replacement, pool.getconn(FakeConnection))
+
+    def test_expired_connections_are_replaced(self):
+        pool = ConnectionPool(max_size=1, timeout=0, max_lifetime=0)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        self.assertIsNot(connection, pool.getconn(FakeConnection))
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRouterTestCase(TransactionTestCase):
+    """
+    'replica' is a test mirror of 'default': same data, separate connection, so queries can be told apart.
+    """
+    databases = {'default', 'replica'}
+    url = reverse('todos:todos-list')
+
+    def setUp(self):
+        scope = routing_scope()
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+        self.user = get_user_model().objects.create(email='replica@example.com')
+        Todo.objects.create(user=self.user, name='Read me')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertReadsFrom(self, alias, func):
+        other = 'default' if alias == 'replica' else 'replica'
+        with CaptureQueriesContext(connections[alias]) as expected, \
+                CaptureQueriesContext(connections[other]) as unexpected:
+            result = func()
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(0, len(unexpected), msg=[query['sql'] for query in unexpected])
+        return result
+
+    def test_reports_read_from_replica(self):
+        with routing_scope():
+            stats = self.assertReadsFrom('replica', todos_utils.fetch_users_todo_stats)
+        self.assertEqual(1, stats[0]['pending_count'])
+
+    def test_writes_pin_to_primary(self):
+        with routing_scope():
+            Todo.objects.create(user=self.user, name='Write me')
+            stats = self.assertReadsFrom('default', todos_utils.fetch_users_todo_stats)
+        self.assertEqual(2, stats[0]['pending_count'])
+
+    def test_transactions_read_from_primary(self):
+        with routing_scope(), transaction.atomic():
+            self.assertReadsFrom('default', todos_utils.fetch_users_todo_stats)
+
+    def test_list_endpoint_is_pinned_after_a_write(self):
+        response = self.assertReadsFrom('replica', lambda: self.client.get(self.url))
+        self.assertEqual(['Read me'], [todo['name'] for todo in response.json()['results']])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        response = self.client.post(self.url, {'name': 'Write me'})
+        self.assertEqual(201, response.status_code)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        # The test client sends the pinning cookie back.
+        response = self.assertReadsFrom('default', lambda: self.client.get(self.url))
+        self.assertEqual(2, len(response.json()['results']))
+
+    def test_sync_reads_from_primary_without_pinning(self):
+        response = self.assertReadsFrom('default', lambda: self.client.get(reverse('todos:todos-sync')))
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class FixtureLoadingTestCase(TestCase):
+    fixture = 'fixtures/01_data_dump.json'
+
+    def snapshot(self):
+        return {
+            'users': list(get_user_model().objects.order_by('pk').values_list('pk', 'email', 'password', 'last_login')),
+            'todos': list(Todo.objects.order_by('pk').values_list('pk', 'user', 'name', 'done', 'date_created')),
+            'projects': list(Project.objects.order_by('pk').values_list('pk', 'name', 'status', 'member_count')),
+            'members': list(ProjectMember.objects.order_by('pk').values_list('pk', 'project', 'member')),
+            'stats': list(
+                UserTodoStats.objects.order_by('user').values_list('user', 'completed_count', 'pending_count')
+            ),
+        }
+
+    def test_load_fixture_matches_loaddata(self):
+        with transaction.atomic():
+            call_command('loaddata', self.fixture, verbosity=0)
+            expected = self.snapshot()
+            transaction.set_rollback(True)
+
+        loaded = load_fixture(self.fixture)
+        self.assertEqual(119, loaded[Todo])
+        self.assertEqual(expected, self.snapshot())
+        self.assertGreater(Todo.objects.create(user_id=1, name='After the fixture').pk, 119)
+
+    def test_generate_dataset(self):
+        call_command('generate_dataset', blocks=3, batch_size=200, stdout=StringIO())
+        self.assertEqual(18, get_user_model().objects.count())
+        self.assertEqual(357, Todo.objects.count())
+        self.assertEqual(33, Project.objects.count())
+        self.assertEqual(75, ProjectMember.objects.count())
+        # Memberships stay within their block: the members of a project share the block number of their emails.
+        blocks = {}
+        for project_id, email in ProjectMember.objects.values_list('project_id', 'member__email'):
+            blocks.setdefault(project_id, set()).add(email.split('@')[0].rsplit('+', 1)[1])
+        self.assertEqual([1] * 33, [len(project_blocks) for project_blocks in blocks.values()])
+        self.assertEqual(UserTodoStats.objects.compute(), {
+            user_id: (completed, pending)
+            for user_id, completed, pending in UserTodoStats.objects.values_list(
+                'user_id', 'completed_count', 'pending_count'
+            )
+        })
+        self.assertEqual(
+            sorted(Project.objects.values_list('member_count', flat=True)),
+            sorted(ProjectMember.objects.values('project').annotate(count=Count('id')).values_list('count', flat=True)),
+        )
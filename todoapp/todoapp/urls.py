@@ -3,6 +3,7 @@ from django.contrib import admin
 
 api_urls = [
     path('todos/', include('todos.urls')),
+    path('', include('projects.urls')),
     path('', include('users.urls')),
 ]
 
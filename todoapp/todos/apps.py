@@ -6,3 +6,6 @@ from django.apps import AppConfig
 class TodosConfig(AppConfig):
     name = 'todos'
     verbose_name = 'TODOs sample application'
+
+    def ready(self):
+        from todos import signals  # noqa: F401
@@ -0,0 +1,186 @@
+"""
+Columnar export of the Todo and ProjectMember tables for analytics (export_todos_columnar command, TodoColumnarExport
+endpoint).
+
+Format (all integers little-endian):
+
+    stream  := MAGIC chunk* end
+    MAGIC   := b'TODOCOL1'
+    chunk   := name_len:u8 name:ascii row_count:u32 column_count:u8 column{column_count}
+    end     := 0:u8                                       (a chunk with an empty name)
+    column  := name_len:u8 name:ascii type:u8 payload_len:u32 payload
+
+    type    payload
+    'i'     i32[row_count]
+    'q'     i64[row_count], -2**63 is null (timestamps: microseconds since the epoch, UTC)
+    'b'     u8[row_count], 0 or 1
+    's'     offsets:u32[row_count + 1] data:utf-8, value k is data[offsets[k]:offsets[k + 1]]
+    'D'     size:u32 values:i32[size] indexes:u16[row_count], value k is values[indexes[k]] (dictionary encoded ids)
+
+Tables are sent as chunks of at most CHUNK_SIZE rows, ``todos`` chunks first, then ``project_members`` chunks.
+Columns: todos ``id:i user:D name:s done:b date_created:q date_completed:q``, project_members
+``id:i project:D member:D``. Every chunk carries its own dictionaries (like Parquet row groups), so neither the
+writer nor a reader ever holds more than one chunk, whatever the size of the tables.
+"""
+import datetime
+import struct
+import sys
+from array import array
+from itertools import islice
+
+from projects.models import ProjectMember
+from todoapp.routers import replica_or_primary
+from todos.models import Todo
+
+MAGIC = b'TODOCOL1'
+# Dictionary indexes are u16, a chunk can hold at most 65536 distinct ids.
+CHUNK_SIZE = 65536
+NULL_TIMESTAMP = -2 ** 63
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+TABLES = (
+    ('todos', Todo, ('id', 'user_id', 'name', 'done', 'date_created', 'date_completed'), 'iDsbqq'),
+    ('project_members', ProjectMember, ('id', 'project_id', 'member_id'), 'iDD'),
+)
+ARRAY_TYPES = {'i': 'i', 'q': 'q', 'b': 'B'}
+
+
+def _packed(typecode, values):
+    packed = array(typecode, values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpacked(typecode, payload):
+    values = array(typecode)
+    values.frombytes(payload)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _short_string(value):
+    value = value.encode('ascii')
+    return struct.pack('<B', len(value)) + value
+
+
+def _microseconds(value):
+    if value is None:
+        return NULL_TIMESTAMP
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def encode_column(column_type, values):
+    """
+    :param column_type: string - One of the column types of the format
+    :param values: list - Values of the column in the chunk
+    :return: bytes - Column payload
+    """
+    if column_type == 'q':
+        return _packed('q', [_microseconds(value) for value in values])
+    if column_type in ARRAY_TYPES:
+        return _packed(ARRAY_TYPES[column_type], values)
+    if column_type == 's':
+        data = [value.encode('utf-8') for value in values]
+        offsets = [0]
+        for value in data:
+            offsets.append(offsets[-1] + len(value))
+        return _packed('I', offsets) + b''.join(data)
+    # 'D': ids in first appearance order.
+    positions = {}
+    indexes = [positions.setdefault(value, len(positions)) for value in values]
+    return struct.pack('<I', len(positions)) + _packed('i', list(positions)) + _packed('H', indexes)
+
+
+def encode_chunk(name, columns, column_types, rows):
+    """
+    :param name: string - Table name
+    :param columns: tuple - Column names
+    :param column_types: string - Column types, one per column
+    :param rows: list of tuples - Rows of the chunk
+    :return: bytes - Chunk
+    """
+    parts = [_short_string(name), struct.pack('<IB', len(rows), len(columns))]
+    for column, column_type, values in zip(columns, column_types, zip(*rows) if rows else [()] * len(columns)):
+        payload = encode_column(column_type, list(values))
+        parts.extend([
+            _short_string(column.replace('_id', '') if column_type == 'D' else column),
+            struct.pack('<BI', ord(column_type), len(payload)),
+            payload,
+        ])
+    return b''.join(parts)
+
+
+def iter_columnar_export(chunk_size=CHUNK_SIZE):
+    """
+    Streams both tables in the columnar format, one chunk of ``chunk_size`` rows at a time.
+    :param chunk_size: integer - Rows per chunk, at most CHUNK_SIZE
+    :return: generator of bytes - The stream, in pieces
+    """
+    chunk_size = min(chunk_size, CHUNK_SIZE)
+    yield MAGIC
+    for name, model, columns, column_types in TABLES:
+        rows = model.objects.using(replica_or_primary(model)).order_by('id').values_list(*columns).iterator(
+            chunk_size=chunk_size
+        )
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield encode_chunk(name, columns, column_types, chunk)
+    yield struct.pack('<B', 0)
+
+
+def _read(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError('Truncated columnar stream')
+    return data
+
+
+def _read_short_string(stream):
+    return _read(stream, struct.unpack('<B', _read(stream, 1))[0]).decode('ascii')
+
+
+def decode_column(column_type, payload, row_count):
+    """
+    :return: list - Values of the column, timestamps as microseconds since the epoch (None for nulls)
+    """
+    if column_type == 'q':
+        return [None if value == NULL_TIMESTAMP else value for value in _unpacked('q', payload)]
+    if column_type == 'b':
+        return [bool(value) for value in _unpacked('B', payload)]
+    if column_type == 'i':
+        return list(_unpacked('i', payload))
+    if column_type == 's':
+        offsets_size = 4 * (row_count + 1)
+        offsets, data = _unpacked('I', payload[:offsets_size]), payload[offsets_size:]
+        return [data[offsets[k]:offsets[k + 1]].decode('utf-8') for k in range(row_count)]
+    if column_type == 'D':
+        size = struct.unpack('<I', payload[:4])[0]
+        values = _unpacked('i', payload[4:4 + 4 * size])
+        return [values[index] for index in _unpacked('H', payload[4 + 4 * size:])]
+    raise ValueError('Unknown column type {!r}'.format(column_type))
+
+
+def read_columnar(stream):
+    """
+    Reads a columnar export back, one chunk at a time.
+    :param stream: binary file object
+    :return: generator of tuples - (table name, {column name: list of values})
+    """
+    if _read(stream, len(MAGIC)) != MAGIC:
+        raise ValueError('Not a columnar todo export')
+    while True:
+        name = _read_short_string(stream)
+        if not name:
+            return
+        row_count, column_count = struct.unpack('<IB', _read(stream, 5))
+        columns = {}
+        for _ in range(column_count):
+            column = _read_short_string(stream)
+            column_type, payload_size = struct.unpack('<BI', _read(stream, 5))
+            columns[column] = decode_column(chr(column_type), _read(stream, payload_size), row_count)
+        yield name, columns
@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from todos.columnar import CHUNK_SIZE, iter_columnar_export
+
+
+class Command(BaseCommand):
+    help = 'Writes the todos and project members in the columnar export format (see todos.columnar).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File to write, - for stdout.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE, help='Rows per chunk (max {}).'.format(CHUNK_SIZE)
+        )
+
+    def handle(self, *args, **options):
+        output = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        try:
+            size = 0
+            for data in iter_columnar_export(options['chunk_size']):
+                output.write(data)
+                size += len(data)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+        if options['output'] != '-':
+            self.stdout.write(self.style.SUCCESS('Wrote {} bytes to {}.'.format(size, options['output'])))
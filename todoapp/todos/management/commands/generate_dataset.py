@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from todoapp.fixtures import BATCH_SIZE, generate_dataset
+
+DATASET_FIXTURE = 'fixtures/01_data_dump.json'
+DATASET_MODELS = (settings.AUTH_USER_MODEL, 'projects.Project', 'todos.Todo', 'projects.ProjectMember')
+
+
+class Command(BaseCommand):
+    help = (
+        'Inserts a synthetic dataset for performance testing: --blocks copies of the users, todos, projects & project '
+        'members of {} (6, 119, 11 & 25 rows per block).'.format(DATASET_FIXTURE)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocks', type=int, default=1000, help='Copies of the fixture to insert.')
+        parser.add_argument(
+            '--first-block', type=int, default=1,
+            help='Number of the first block, above the last block of a previous run to add to its dataset.',
+        )
+        parser.add_argument('--spread-days', type=int, default=365, help='Days over which todo dates are spread.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per INSERT.')
+        parser.add_argument('--fixture', default=DATASET_FIXTURE, help='Fixture to copy.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to use.')
+
+    def handle(self, *args, **options):
+        inserted = generate_dataset(
+            options['fixture'], DATASET_MODELS, options['blocks'], first_block=options['first_block'],
+            spread_days=options['spread_days'], batch_size=options['batch_size'], using=options['database'],
+        )
+        for model, count in inserted.items():
+            self.stdout.write('{}: {} row(s)'.format(model._meta.label, count))
+        self.stdout.write(self.style.SUCCESS('Generated {} block(s).'.format(options['blocks'])))
@@ -0,0 +1,20 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from todos.models import TodoTombstone
+
+
+class Command(BaseCommand):
+    help = 'Deletes the todo tombstones older than TODO_SYNC_TOMBSTONE_DAYS, which no accepted sync watermark needs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to use.')
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - datetime.timedelta(days=settings.TODO_SYNC_TOMBSTONE_DAYS)
+        deleted, _ = TodoTombstone.objects.using(options['database']).filter(date_deleted__lt=horizon).delete()
+        self.stdout.write(self.style.SUCCESS('Purged {} todo tombstone(s).'.format(deleted)))
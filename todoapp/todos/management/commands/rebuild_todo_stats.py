@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from todos.models import UserTodoStats
+
+
+class Command(BaseCommand):
+    help = 'Reports drift between the UserTodoStats counters and the Todo table, then rebuilds the counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report drift, exit with an error if any is found. Nothing is rebuilt.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to use.')
+
+    def handle(self, *args, **options):
+        manager = UserTodoStats.objects.db_manager(options['database'])
+        expected = manager.compute()
+        stored = {
+            user_id: (completed, pending)
+            for user_id, completed, pending in manager.values_list('user_id', 'completed_count', 'pending_count')
+        }
+
+        drifted = []
+        for user_id in sorted(set(expected) | set(stored)):
+            actual = stored.get(user_id, (0, 0))
+            wanted = expected.get(user_id, (0, 0))
+            if actual != wanted:
+                drifted.append(user_id)
+                self.stdout.write(
+                    'user {}: stored completed/pending {}/{}, expected {}/{}'.format(user_id, *(actual + wanted))
+                )
+        self.stdout.write('{} user(s) with drifted todo stats.'.format(len(drifted)))
+
+        if options['check']:
+            if drifted:
+                raise CommandError('Todo stats drift detected.')
+            return
+
+        rows = manager.rebuild()
+        self.stdout.write(self.style.SUCCESS('Rebuilt todo stats for {} user(s).'.format(rows)))
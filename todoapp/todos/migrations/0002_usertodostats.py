@@ -0,0 +1,40 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:17
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def populate_user_todo_stats(apps, schema_editor):
+    Todo = apps.get_model('todos', 'Todo')
+    UserTodoStats = apps.get_model('todos', 'UserTodoStats')
+    db_alias = schema_editor.connection.alias
+    rows = Todo.objects.using(db_alias).order_by().values('user_id').annotate(
+        completed_count=Count('id', filter=Q(done=True)),
+        pending_count=Count('id', filter=Q(done=False)),
+    )
+    UserTodoStats.objects.using(db_alias).bulk_create([UserTodoStats(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTodoStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='todo_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'user todo stats',
+            },
+        ),
+        migrations.RunPython(populate_user_todo_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todos', '0002_usertodostats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['user', 'done'], name='todo_user_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('done', True)), fields=['date_created'], name='todo_done_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['user', 'date_created', 'id'], include=('name', 'done'), name='todo_user_created_cov_idx'),
+        ),
+        migrations.AlterField(
+            model_name='todo',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='todos', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
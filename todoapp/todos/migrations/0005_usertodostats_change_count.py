@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0004_todo_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertodostats',
+            name='change_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -1,16 +1,304 @@
-from django.db import models
-from django.utils.encoding import smart_text as smart_unicode
-from django.utils.translation import ugettext_lazy as _
+import datetime
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.encoding import smart_str as smart_unicode
+from django.utils.translation import gettext_lazy as _
+
+from todoapp.report_cache import bump_generations
+from todos.sync import ChangeVersion
+
+
+class TodoQuerySet(models.QuerySet):
+    """
+    Keeps UserTodoStats (and the report cache generations) in sync for the bulk write paths that bypass model
+    signals.
+    """
+
+    def created_between(self, start, end):
+        """
+        Todos created from the start of day ``start`` up to, excluding, the start of day ``end``, days being those of
+        the current time zone.
+        The days are turned into the aware, half-open interval [start 00:00, end 00:00) so the filter is a plain
+        range on date_created (no __date cast), which the date_created indexes can serve.
+        :param start: date - First day of the range
+        :param end: date - Day ending the range (excluded)
+        :return: QuerySet - Todos created within the range
+        """
+        tz = timezone.get_current_timezone()
+        lower, upper = (
+            timezone.make_aware(datetime.datetime.combine(day, datetime.time.min), tz) for day in (start, end)
+        )
+        return self.filter(date_created__gte=lower, date_created__lt=upper)
+
+    def seek(self, date_created, pk):
+        """
+        Todos sorting strictly after ``(date_created, pk)`` in the ``date_created, id`` order (keyset pagination).
+        :param date_created: datetime - Sort key of the last todo already read
+        :param pk: integer - Id of the last todo already read
+        :return: QuerySet - The following todos
+        """
+        # The leading range on date_created alone lets the planner seek the index, the OR breaks ties on id.
+        return self.filter(date_created__gte=date_created).filter(Q(date_created__gt=date_created) | Q(id__gt=pk))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.version = ChangeVersion()
+        with transaction.atomic(using=self.db):
+            created = super(TodoQuerySet, self).bulk_create(objs, *args, **kwargs)
+            UserTodoStats.objects.db_manager(self.db).refresh({obj.user_id for obj in objs}, changed=True)
+            bump_generations([self.model], using=self.db)
+        for obj in objs:
+            obj._loaded_state = (obj.user_id, obj.done)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # bulk_update() goes through update() below, which refreshes the counters.
+        objs = list(objs)
+        updated = super(TodoQuerySet, self).bulk_update(objs, fields, *args, **kwargs)
+        for obj in objs:
+            obj._loaded_state = (obj.user_id, obj.done)
+        return updated
+
+    def update(self, **kwargs):
+        kwargs.setdefault('version', ChangeVersion())
+        if not {'user', 'user_id', 'done'} & set(kwargs):
+            with transaction.atomic(using=self.db):
+                # Owners are unchanged, but matched before the update: it may change the filtered fields.
+                UserTodoStats.objects.db_manager(self.db).filter(
+                    user_id__in=self.order_by().values('user_id')
+                ).update(change_count=F('change_count') + 1)
+                updated = super(TodoQuerySet, self).update(**kwargs)
+                bump_generations([self.model], using=self.db)
+            return updated
+
+        if not {'user', 'user_id'} & set(kwargs):
+            with transaction.atomic(using=self.db):
+                user_ids = set(self.values_list('user_id', flat=True).distinct())
+                updated = super(TodoQuerySet, self).update(**kwargs)
+                UserTodoStats.objects.db_manager(self.db).refresh(user_ids, changed=True)
+                bump_generations([self.model], using=self.db)
+            return updated
+
+        new_user = kwargs.get('user_id', kwargs.get('user'))
+        with transaction.atomic(using=self.db):
+            previous_owners = dict(self.values_list('pk', 'user_id'))
+            updated = super(TodoQuerySet, self).update(**kwargs)
+            if hasattr(new_user, 'resolve_expression'):
+                owners = dict(Todo.objects.using(self.db).filter(pk__in=previous_owners).values_list('pk', 'user_id'))
+            else:
+                owners = dict.fromkeys(previous_owners, getattr(new_user, 'pk', new_user))
+            # The todos left their previous owners' lists, which the delta sync must report.
+            TodoTombstone.objects.using(self.db).bulk_create([
+                TodoTombstone(todo_id=pk, user_id=user_id, version=ChangeVersion())
+                for pk, user_id in previous_owners.items() if owners.get(pk) != user_id
+            ])
+            user_ids = set(previous_owners.values()) | set(owners.values())
+            UserTodoStats.objects.db_manager(self.db).refresh(user_ids, changed=True)
+            bump_generations([self.model], using=self.db)
+        return updated
 
 
 class Todo(models.Model):
     """
-        Needed fields
-        - user (fk to User Model - Use AUTH_USER_MODEL from django.conf.settings)
-        - name (max_length=1000)
-        - done (boolean with default been false)
-        - date_created (with default of creation time)
-        - date_completed (set it when done is marked true)
+    A single todo item of a user. ``date_completed`` is stamped when the todo is marked done.
+    """
+    # Lookups by user are served by the composite indexes below, no standalone FK index needed.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='todos', db_index=False
+    )
+    name = models.CharField(_('name'), max_length=1000)
+    done = models.BooleanField(_('done'), default=False)
+    date_created = models.DateTimeField(_('date created'), default=timezone.now)
+    date_completed = models.DateTimeField(_('date completed'), null=True, blank=True)
+    # Stamped with todos.sync.ChangeVersion() on every write, for the delta sync.
+    version = models.BigIntegerField(default=0, editable=False)
+
+    objects = TodoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Per user done/pending counts.
+            models.Index(fields=['user', 'done'], name='todo_user_done_idx'),
+            # Completed todos created within a date range.
+            models.Index(fields=['date_created'], name='todo_done_created_idx', condition=Q(done=True)),
+            # A user's todo list ordered by creation, answered from the index alone.
+            models.Index(
+                fields=['user', 'date_created', 'id'], name='todo_user_created_cov_idx', include=['name', 'done']
+            ),
+            # A user's todos changed since a sync watermark.
+            models.Index(fields=['user', 'version'], name='todo_user_version_idx'),
+        ]
+
+    # (user_id, done) as last read from / written to the database, used to apply stats deltas.
+    _loaded_state = None
+
+    def __str__(self):
+        return smart_unicode(self.name)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Todo, cls).from_db(db, field_names, values)
+        if 'user_id' in field_names and 'done' in field_names:
+            instance._loaded_state = (instance.user_id, instance.done)
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.done and self.date_completed is None:
+            self.date_completed = timezone.now()
+        elif not self.done:
+            self.date_completed = None
+        self.version = ChangeVersion()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'version'}
+        using = kwargs.get('using') or router.db_for_write(Todo, instance=self)
+        # The stats counters are updated from post_save; keep both writes in one transaction.
+        with transaction.atomic(using=using):
+            if self._loaded_state is not None:
+                previous_user_id = self._loaded_state[0]
+            elif not self._state.adding:
+                # Previous state unknown (e.g. deferred fields), look the previous owner up.
+                previous_user_id = Todo.objects.using(using).filter(pk=self.pk).values_list(
+                    'user_id', flat=True
+                ).first()
+            else:
+                previous_user_id = None
+            recount_previous_user = self._loaded_state is None
+            super(Todo, self).save(*args, **kwargs)
+            if previous_user_id is not None and previous_user_id != self.user_id:
+                # Moved to another user: gone from the previous owner's list, for the delta sync.
+                TodoTombstone.objects.using(using).create(
+                    todo_id=self.pk, user_id=previous_user_id, version=ChangeVersion()
+                )
+                if recount_previous_user:
+                    # post_save only recounts the current owner when the previous state is unknown.
+                    UserTodoStats.objects.db_manager(using).refresh([previous_user_id], changed=True)
+
+
+class UserTodoStatsManager(models.Manager):
+
+    def compute(self, user_ids=None):
+        """
+        Counts done & pending todos straight from the Todo table.
+        :param user_ids: iterable - Restrict the counts to these users (all users when None)
+        :return: dict - user_id -> (completed_count, pending_count) for users having todos
+        """
+        todos = Todo.objects.using(self.db)
+        if user_ids is not None:
+            todos = todos.filter(user_id__in=user_ids)
+        rows = todos.order_by().values('user_id').annotate(
+            completed_count=Count('id', filter=Q(done=True)),
+            pending_count=Count('id', filter=Q(done=False)),
+        ).values_list('user_id', 'completed_count', 'pending_count')
+        return {user_id: (completed, pending) for user_id, completed, pending in rows}
+
+    def refresh(self, user_ids, changed=False):
+        """
+        Recomputes the counters of the given users from the Todo table and upserts them.
+        :param user_ids: iterable - Users whose counters should be recomputed
+        :param changed: boolean - The users' todos were written, also bump their change_count
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        counts = dict.fromkeys(user_ids, (0, 0))
+        counts.update(self.compute(user_ids))
+        self.bulk_create(
+            [
+                self.model(user_id=user_id, completed_count=completed, pending_count=pending)
+                for user_id, (completed, pending) in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['completed_count', 'pending_count'],
+        )
+        if changed:
+            self.touch(user_ids)
+
+    def apply_delta(self, user_id, completed=0, pending=0):
+        """
+        Atomically shifts a user's counters and bumps their change_count, creating the row from the Todo table when
+        it is missing.
+        """
+        updated = self.filter(user_id=user_id).update(
+            completed_count=F('completed_count') + completed,
+            pending_count=F('pending_count') + pending,
+            change_count=F('change_count') + 1,
+        )
+        if not updated:
+            self.refresh([user_id], changed=True)
+
+    def touch(self, user_ids):
+        """
+        Bumps the change_count of the given users, whose todos were written.
+        :param user_ids: iterable - Users whose todos were written
+        """
+        self.filter(user_id__in=user_ids).update(change_count=F('change_count') + 1)
+
+    def rebuild(self):
+        """
+        Drops and recreates every counter row from the Todo table.
+        :return: int - Number of rows written
+        """
+        with transaction.atomic(using=self.db):
+            # Carried over (and bumped): a change_count going back to an earlier value would revalidate stale ETags.
+            change_counts = dict(self.values_list('user_id', 'change_count'))
+            self.all().delete()
+            rows = self.bulk_create([
+                self.model(
+                    user_id=user_id, completed_count=completed, pending_count=pending,
+                    change_count=change_counts.get(user_id, 0) + 1,
+                )
+                for user_id, (completed, pending) in self.compute().items()
+            ])
+            # Reports read the counters as Todo data (cached_report(Todo, ...)).
+            bump_generations([Todo], using=self.db)
+        return len(rows)
+
+
+class UserTodoStats(models.Model):
+    """
+    Denormalized done & pending todo counts and change counter per user, maintained incrementally on Todo writes.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='todo_stats'
+    )
+    completed_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    # Bumped in the transaction of every write to the user's todos, validates the todo list ETags. The row lock
+    # orders concurrent writers, so every commit leaves a new value (unlike Todo.version, see todos.sync).
+    change_count = models.PositiveBigIntegerField(default=0)
+
+    objects = UserTodoStatsManager()
+
+    class Meta:
+        verbose_name_plural = 'user todo stats'
+
+    def __str__(self):
+        return '{} - {}/{}'.format(self.user_id, self.completed_count, self.pending_count)
 
-        Add string representation for this model with todos name.
+
+class TodoTombstone(models.Model):
+    """
+    Marks a deleted todo (or, for its previous owner, one moved to another user) for the delta sync, stamped with the
+    version of the deleting transaction. Purged after settings.TODO_SYNC_TOMBSTONE_DAYS (purge_todo_tombstones), older
+    sync watermarks are refused.
     """
+    todo_id = models.IntegerField()
+    # No constraint: the tombstones of a deleted user are left for the purge. Lookups use the index below.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    version = models.BigIntegerField()
+    date_deleted = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'version'], name='tombstone_user_version_idx'),
+        ]
+
+    def __str__(self):
+        return '{} - {}'.format(self.todo_id, self.version)
@@ -0,0 +1,107 @@
+import base64
+import json
+
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TodoKeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over ``(date_created, id)``.
+    The opaque cursor encodes the sort key of the last row of the previous page and the next page is fetched with
+    ``WHERE (date_created, id) > cursor ORDER BY date_created, id LIMIT n``, so every page costs the same index
+    range scan no matter how deep it is (no OFFSET).
+
+    Response
+    {
+      "next": "<url with cursor or null>",
+      "results": [...]
+    }
+    """
+    cursor_query_param = 'cursor'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset for async views, fetching the page with the async ORM.
+        """
+        return self.set_page([row async for row in self.get_page_queryset(queryset, request)])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Narrows the queryset down to the requested page, plus one row telling whether a next page exists.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by('date_created', 'id')
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.seek(*position)
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    @staticmethod
+    def get_query_params(request):
+        # DRF Request or plain Django HttpRequest (async views).
+        return getattr(request, 'query_params', request.GET)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(self.get_query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = self.get_query_params(request).get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            date_created, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            position = (parse_datetime(date_created), int(pk))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, todo):
+        position = json.dumps([todo.date_created.isoformat(), todo.pk], separators=(',', ':'))
+        return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_data(self, data):
+        return {'next': self.get_next_link(), 'results': data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
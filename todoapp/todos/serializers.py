@@ -1,7 +1,265 @@
+from operator import attrgetter
+
 from django.contrib.auth import get_user_model
-from rest_framework import serializers
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+
+from projects.models import Project
+from todos.models import Todo
+
+# Fields whose database value already is the JSON primitive to emit.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.IntegerField, serializers.ReadOnlyField,
+)
+
+
+class PlainListSerializer(serializers.ListSerializer):
+    """
+    List serializer whose ``data`` is a plain list instead of a ReturnList.
+    """
+
+    @property
+    def data(self):
+        if hasattr(self, 'initial_data'):
+            return super(PlainListSerializer, self).data
+        if not hasattr(self, '_data'):
+            self._data = self.to_representation(self.instance)
+        return self._data
+
+
+class PlainModelSerializer(serializers.ModelSerializer):
+    """
+    Read path optimised base serializer for the report utils.
+    ``data`` is made of plain dicts & lists (json ready, no ReturnDict/ReturnList wrappers), attributes of simple
+    fields are read with an ``attrgetter`` and emitted as is, and date times are formatted straight with
+    ``strftime``. The field plan is built once per serializer instance, so with ``many=True`` it is shared by all
+    rows.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {key: kwargs.pop(key) for key in serializers.LIST_SERIALIZER_KWARGS_REMOVE if key in kwargs}
+        list_kwargs['child'] = cls(*args, **kwargs)
+        list_kwargs.update({
+            key: value for key, value in kwargs.items() if key in serializers.LIST_SERIALIZER_KWARGS
+        })
+        return PlainListSerializer(*args, **list_kwargs)
+
+    @property
+    def data(self):
+        if hasattr(self, 'initial_data'):
+            return super(PlainModelSerializer, self).data
+        if not hasattr(self, '_data'):
+            self._data = self.to_representation(self.instance)
+        return self._data
+
+    def _field_plan(self):
+        plan = []
+        for field in self._readable_fields:
+            # Plain attribute reads only; methods such as get_FOO_display go through DRF which calls them.
+            simple_source = (
+                field.source != '*' and len(field.source_attrs) == 1
+                and not callable(getattr(self.Meta.model, field.source, None))
+            )
+            getter = attrgetter(field.source) if simple_source else field.get_attribute
+            if simple_source and isinstance(field, PASSTHROUGH_FIELDS):
+                convert = None
+            elif self._is_strftime_field(field):
+                convert = self._datetime_formatter(
+                    field.format, getattr(field, 'timezone', None) or field.default_timezone()
+                )
+            else:
+                convert = field.to_representation
+            plan.append((field.field_name, getter, convert))
+        return plan
+
+    @staticmethod
+    def _is_strftime_field(field):
+        output_format = getattr(field, 'format', None)
+        return (
+            isinstance(field, serializers.DateTimeField) and isinstance(output_format, str)
+            and output_format.lower() != ISO_8601
+        )
+
+    @staticmethod
+    def _datetime_formatter(output_format, field_timezone):
+        if field_timezone is None:
+            return lambda value: value.strftime(output_format)
+        return lambda value: timezone.localtime(value, field_timezone).strftime(output_format)
+
+    def to_representation(self, instance):
+        plan = self.__dict__.get('_plan')
+        if plan is None:
+            plan = self._plan = self._field_plan()
+
+        ret = {}
+        for field_name, getter, convert in plan:
+            value = getter(instance)
+            ret[field_name] = value if convert is None or value is None else convert(value)
+        return ret
+
+
+class TodoSerializer(serializers.ModelSerializer):
+    """
+    Todo of the requesting user, as read and written by TodoAPIViewSet.
+    """
+
+    class Meta:
+        model = Todo
+        fields = ('name', 'done', 'date_created')
+        read_only_fields = ('date_created',)
+
+
+class TodoSyncSerializer(TodoSerializer):
+    """
+    Todo as sent by the TodoAPIViewSet delta sync, identified by its id.
+    """
+
+    class Meta(TodoSerializer.Meta):
+        fields = ('id',) + TodoSerializer.Meta.fields
+
+
+class TodoPatchSerializer(serializers.Serializer):
+    """
+    A ``{id, done}`` item of the TodoAPIViewSet bulk call.
+    """
+    id = serializers.IntegerField(min_value=1)
+    done = serializers.BooleanField()
+
+
+class TodoBulkSerializer(serializers.Serializer):
+    """
+    Validates the ``{create: [...], update: [...]}`` envelope of the TodoAPIViewSet bulk call. The items themselves are
+    validated one by one (TodoSerializer / TodoPatchSerializer), so that an invalid item only fails itself.
+    """
+    MAX_ITEMS = 1000
+
+    create = serializers.ListField(child=serializers.DictField(), required=False, max_length=MAX_ITEMS)
+    update = serializers.ListField(child=serializers.DictField(), required=False, max_length=MAX_ITEMS)
+
+    def validate(self, attrs):
+        if not attrs.get('create') and not attrs.get('update'):
+            raise serializers.ValidationError('Nothing to create or update.')
+        return attrs
+
+
+class UserSerializer(PlainModelSerializer):
+
+    class Meta:
+        model = get_user_model()
+        fields = ('id', 'first_name', 'last_name', 'email')
+
+
+class UserTodoStatsSerializer(PlainModelSerializer):
+    """
+    User details along with the done & pending todo counts annotated on the queryset.
+    """
+    completed_count = serializers.IntegerField(read_only=True)
+    pending_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = ('id', 'first_name', 'last_name', 'email', 'completed_count', 'pending_count')
+
+
+class UserPendingTodoSerializer(PlainModelSerializer):
+    """
+    User details along with the pending todo count annotated on the queryset.
+    """
+    pending_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = ('id', 'first_name', 'last_name', 'email', 'pending_count')
+
+
+class CreatorSerializer(PlainModelSerializer):
+
+    class Meta:
+        model = get_user_model()
+        fields = ('first_name', 'last_name', 'email')
+
+
+class TodoWithCreatorSerializer(PlainModelSerializer):
+    """
+    Todo details along with its creator. Expects the queryset to ``select_related('user')``.
+    """
+    status = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField(source='date_created', format='%I:%M %p, %d %b, %Y')
+    creator = CreatorSerializer(source='user')
+
+    class Meta:
+        model = Todo
+        fields = ('id', 'name', 'status', 'created_at', 'creator')
+
+    def get_status(self, todo):
+        return 'Done' if todo.done else 'To Do'
+
+
+class CompletedTodoSerializer(TodoWithCreatorSerializer):
+    """
+    Todo details along with its creator's name & email. Expects the queryset to ``select_related('user')``.
+    """
+    creator = serializers.CharField(source='user.get_full_name')
+    email = serializers.CharField(source='user.email')
+
+    class Meta(TodoWithCreatorSerializer.Meta):
+        fields = ('id', 'name', 'creator', 'email', 'created_at', 'status')
+
+
+class ProjectDetailSerializer(PlainModelSerializer):
+    status = serializers.CharField(source='get_status_display')
+    existing_member_count = serializers.IntegerField(source='member_count')
+
+    class Meta:
+        model = Project
+        fields = ('id', 'name', 'status', 'existing_member_count', 'max_members')
+
+
+class MemberTodoStatsSerializer(PlainModelSerializer):
+    """
+    Project member details along with its done & pending todo counts annotated on the queryset.
+    """
+    pending_count = serializers.IntegerField(read_only=True)
+    completed_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = ('first_name', 'last_name', 'email', 'pending_count', 'completed_count')
+
+
+class ProjectReportSerializer(PlainModelSerializer):
+    """
+    Project title along with its members' todo counts. Expects ``report_members`` to be set on every project.
+    """
+    project_title = serializers.CharField(source='name')
+    report = MemberTodoStatsSerializer(source='report_members', many=True)
+
+    class Meta:
+        model = Project
+        fields = ('project_title', 'report')
+
+
+class UserProjectStatusSerializer(PlainModelSerializer):
+    """
+    User details along with its project names bucketed by project status, as set on every user.
+    """
+    to_do_projects = serializers.ListField(child=serializers.CharField(), read_only=True)
+    in_progress_projects = serializers.ListField(child=serializers.CharField(), read_only=True)
+    completed_projects = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = ('first_name', 'last_name', 'email', 'to_do_projects', 'in_progress_projects', 'completed_projects')
 
 
-# Add your serializer(s) here
+class ProjectSummarySerializer(PlainModelSerializer):
+    project_name = serializers.CharField(source='name')
+    done = serializers.SerializerMethodField()
 
+    class Meta:
+        model = Project
+        fields = ('project_name', 'done', 'max_members')
 
+    def get_done(self, project):
+        return project.status == Project.COMPLETED
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Project, ProjectMember
+from todoapp.report_cache import bump_generations
+from todos.models import Todo, TodoTombstone, UserTodoStats
+from todos.sync import ChangeVersion
+
+# Models read by the cached report utils (todos/utils.py).
+REPORT_MODELS = (Todo, Project, ProjectMember, settings.AUTH_USER_MODEL)
+# Saves touching only these fields do not change any report (e.g. the last_login stamp of every login).
+REPORT_IGNORED_UPDATE_FIELDS = frozenset(['last_login'])
+
+
+def _delta(done, step):
+    return {'completed': step, 'pending': 0} if done else {'completed': 0, 'pending': step}
+
+
+@receiver(post_save, sender=Todo)
+def update_user_todo_stats_on_save(sender, instance, created, using, **kwargs):
+    stats = UserTodoStats.objects.db_manager(using)
+    current = (instance.user_id, instance.done)
+    if created:
+        stats.apply_delta(instance.user_id, **_delta(instance.done, 1))
+    elif instance._loaded_state is None:
+        # Previous state unknown (e.g. deferred fields), recount this user.
+        stats.refresh([instance.user_id], changed=True)
+    elif instance._loaded_state != current:
+        previous_user_id, previous_done = instance._loaded_state
+        stats.apply_delta(previous_user_id, **_delta(previous_done, -1))
+        stats.apply_delta(instance.user_id, **_delta(instance.done, 1))
+    else:
+        stats.touch([instance.user_id])
+    instance._loaded_state = current
+
+
+@receiver(post_delete, sender=Todo)
+def update_user_todo_stats_on_delete(sender, instance, using, **kwargs):
+    # No recount fallback here: the user row may be going away in the same cascade.
+    field = 'completed_count' if instance.done else 'pending_count'
+    UserTodoStats.objects.db_manager(using).filter(user_id=instance.user_id).update(
+        change_count=F('change_count') + 1, **{field: F(field) - 1}
+    )
+
+
+@receiver(post_delete, sender=Todo)
+def record_todo_tombstone(sender, instance, using, **kwargs):
+    TodoTombstone.objects.using(using).create(todo_id=instance.pk, user_id=instance.user_id, version=ChangeVersion())
+
+
+def invalidate_reports_on_save(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields and update_fields <= REPORT_IGNORED_UPDATE_FIELDS:
+        return
+    bump_generations([sender], using=using)
+
+
+def invalidate_reports_on_delete(sender, instance, using, **kwargs):
+    bump_generations([sender], using=using)
+
+
+for report_model in REPORT_MODELS:
+    post_save.connect(invalidate_reports_on_save, sender=report_model, dispatch_uid='invalidate_reports_on_save')
+    # A post_delete receiver disables fast (single query) deletes of the sender. ProjectMember deletes bump from
+    # ProjectMember.delete() and its queryset instead, cascades from the Project and user deletes.
+    if report_model is not ProjectMember:
+        post_delete.connect(
+            invalidate_reports_on_delete, sender=report_model, dispatch_uid='invalidate_reports_on_delete'
+        )
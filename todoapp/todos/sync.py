@@ -0,0 +1,82 @@
+"""
+Change versions of the todo delta sync (TodoAPIViewSet sync).
+
+Every write stamps the todo (or the tombstone of a deleted todo) with ``ChangeVersion()``, the id of the writing
+transaction on PostgreSQL. Versions are handed out in transaction *start* order but become visible in *commit*
+order, so a sync cannot resume from the highest version it has seen: a transaction started earlier may still commit
+rows with a lower version. It resumes from ``watermark()`` instead, the oldest transaction id still in progress when
+it started reading (``txid_snapshot_xmin``). Everything below it is committed (or rolled back) and already read;
+rows at or above it are read again by the next sync, which clients apply idempotently.
+
+Other databases (SQLite in development) stamp the statement time in microseconds, they run one writer at a time.
+"""
+import base64
+import json
+
+from django.db import NotSupportedError, connections
+from django.db.models import BigIntegerField, Func
+from django.db.models.sql import Query
+
+SQLITE_NOW_MICROSECONDS = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+class ChangeVersion(Func):
+    """
+    Version of the rows written by the current transaction.
+    """
+    output_field = BigIntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError('Todo change versions are not supported on {}.'.format(connection.vendor))
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return 'txid_current()', []
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return SQLITE_NOW_MICROSECONDS, []
+
+
+class Watermark(ChangeVersion):
+    """
+    Lowest version which may still become visible: rows below it are all visible to the current statement.
+    """
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return 'txid_snapshot_xmin(txid_current_snapshot())', []
+
+
+def watermark(using):
+    """
+    Reads the version a sync starting now can resume from next time. Must be read before the changes.
+    :param using: string - Database alias the changes are read from
+    :return: integer - Watermark
+    """
+    sql, params = Query(None).get_compiler(using).compile(Watermark())
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT {}'.format(sql), params)
+        return cursor.fetchone()[0]
+
+
+def encode_watermark(version, issued_at):
+    """
+    :param version: integer - Watermark
+    :param issued_at: datetime - When it was read, tells whether the tombstones it needs may have been purged
+    :return: string - Opaque ``since`` token handed to clients
+    """
+    position = json.dumps([version, int(issued_at.timestamp())], separators=(',', ':'))
+    return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+
+def decode_watermark(token):
+    """
+    :param token: string - ``since`` token of encode_watermark
+    :return: tuple - (version, issued_at timestamp)
+    :raises ValueError: the token is malformed
+    """
+    try:
+        version, issued_at = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('ascii'))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid watermark')
+    if not isinstance(version, int) or not isinstance(issued_at, int):
+        raise ValueError('Invalid watermark')
+    return version, issued_at
@@ -0,0 +1,62 @@
+import datetime
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from todos.models import Todo
+
+SEED_USERS = 1000
+SEED_TODOS = 1000000
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Planner assertions target PostgreSQL.')
+class TodoIndexUsageTest(TestCase):
+    """
+    Seeds a 1M row todo table and asserts the report access paths are answered by index scans.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO users_customuser (password, is_superuser, first_name, last_name, email, is_staff, "
+                "is_active, date_joined) "
+                "SELECT '', false, 'User', s::text, 'user' || s || '@example.com', false, true, now() "
+                "FROM generate_series(1, %s) AS s",
+                [SEED_USERS]
+            )
+            cursor.execute("SELECT min(id) FROM users_customuser")
+            cls.first_user_id = cursor.fetchone()[0]
+            cursor.execute(
+                "INSERT INTO todos_todo (user_id, name, done, date_created, date_completed, version) "
+                "SELECT %s + s %% %s, 'TODO - ' || s, s %% 3 = 0, "
+                "timestamptz '2021-01-01' + s * interval '30 seconds', NULL, txid_current() "
+                "FROM generate_series(1, %s) AS s",
+                [cls.first_user_id, SEED_USERS, SEED_TODOS]
+            )
+            cursor.execute('ANALYZE todos_todo')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn('Seq Scan', plan)
+
+    def test_user_done_filter(self):
+        self.assertUsesIndex(
+            Todo.objects.filter(user_id=self.first_user_id, done=False).values('id'), 'todo_user_done_idx'
+        )
+
+    def test_completed_date_range(self):
+        start = timezone.make_aware(datetime.datetime(2021, 3, 1))
+        todos = Todo.objects.filter(
+            done=True, date_created__gte=start, date_created__lt=start + datetime.timedelta(days=1)
+        )
+        self.assertUsesIndex(todos, 'todo_done_created_idx')
+
+    def test_user_todo_list(self):
+        todos = Todo.objects.filter(user_id=self.first_user_id).order_by('date_created', 'id').values(
+            'name', 'done', 'date_created'
+        )
+        self.assertUsesIndex(todos, 'todo_user_created_cov_idx')
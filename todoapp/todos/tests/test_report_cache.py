@@ -0,0 +1,109 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from projects.models import Project, ProjectMember
+from todoapp.report_cache import CacheInfo, clear_report_cache_info
+from todos import utils as todos_utils
+from todos.models import Todo, UserTodoStats
+
+REPORT_CACHES = {
+    'reports': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'report-cache-tests'},
+}
+
+
+# Committed writes only (the cache is bypassed inside transactions), hence TransactionTestCase.
+@override_settings(CACHES=REPORT_CACHES, REPORT_CACHE={'CACHE_ALIAS': 'reports', 'TIMEOUT': 300})
+class ReportCacheTestCase(TransactionTestCase):
+
+    def setUp(self):
+        caches['reports'].clear()
+        clear_report_cache_info()
+        self.user = get_user_model().objects.create(first_name='Amal', last_name='Raj', email='amal@example.com')
+        Todo.objects.create(user=self.user, name='TODO - 1')
+        self.project = Project.objects.create(name='Project A', max_members=2)
+
+    def test_hit_until_a_read_model_is_written(self):
+        self.assertEqual(todos_utils.fetch_users_todo_stats()[0]['pending_count'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(todos_utils.fetch_users_todo_stats()[0]['pending_count'], 1)
+        self.assertEqual(todos_utils.fetch_users_todo_stats.cache_info(), CacheInfo(hits=1, misses=1))
+
+        Todo.objects.create(user=self.user, name='TODO - 2')
+        with self.assertNumQueries(1):
+            self.assertEqual(todos_utils.fetch_users_todo_stats()[0]['pending_count'], 2)
+
+    def test_writes_to_other_models_keep_the_result(self):
+        todos_utils.fetch_all_users()
+        Todo.objects.create(user=self.user, name='TODO - 2')
+        self.project.save()
+        with self.assertNumQueries(0):
+            todos_utils.fetch_all_users()
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            todos_utils.fetch_all_users()
+
+    def test_keyed_by_arguments(self):
+        self.assertEqual(len(todos_utils.fetch_users_with_n_pending_todos(1)), 1)
+        self.assertEqual(len(todos_utils.fetch_users_with_n_pending_todos(2)), 0)
+        self.assertEqual(todos_utils.fetch_users_with_n_pending_todos.cache_info(), CacheInfo(hits=0, misses=2))
+
+    def test_bulk_writes_invalidate(self):
+        self.assertEqual(todos_utils.fetch_projects_details()[0]['existing_member_count'], 0)
+        ProjectMember.objects.bulk_create([ProjectMember(project=self.project, member=self.user)])
+        self.assertEqual(todos_utils.fetch_projects_details()[0]['existing_member_count'], 1)
+
+        ProjectMember.objects.filter(project=self.project).delete()
+        self.assertEqual(todos_utils.fetch_projects_details()[0]['existing_member_count'], 0)
+
+        todos_utils.fetch_users_todo_stats()
+        Todo.objects.update(done=True)
+        self.assertEqual(todos_utils.fetch_users_todo_stats()[0]['completed_count'], 1)
+
+    def test_rebuilding_the_counters_invalidates(self):
+        # Drifted counters, as rebuild_todo_stats repairs them.
+        UserTodoStats.objects.filter(user=self.user).update(pending_count=5)
+        self.assertEqual(todos_utils.fetch_users_todo_stats()[0]['pending_count'], 5)
+        call_command('rebuild_todo_stats', stdout=StringIO())
+        self.assertEqual(todos_utils.fetch_users_todo_stats()[0]['pending_count'], 1)
+
+    def test_keyed_by_time_zone(self):
+        Todo.objects.create(
+            user=self.user, name='New year', done=True,
+            date_created=datetime.datetime(2021, 12, 31, 20, tzinfo=datetime.timezone.utc),
+        )
+        with override_settings(TIME_ZONE='UTC'):
+            todos = todos_utils.fetch_completed_todos_with_in_date_range('31-12-2021', '01-01-2022')
+            self.assertEqual(['New year'], [todo['name'] for todo in todos])
+        # 01:30 on the 1st in India, outside of the range.
+        with override_settings(TIME_ZONE='Asia/Kolkata'):
+            self.assertEqual([], todos_utils.fetch_completed_todos_with_in_date_range('31-12-2021', '01-01-2022'))
+        self.assertEqual(
+            todos_utils.fetch_completed_todos_with_in_date_range.cache_info(), CacheInfo(hits=0, misses=2)
+        )
+
+    def test_bypassed_inside_transactions(self):
+        todos_utils.fetch_all_users()
+        with transaction.atomic():
+            get_user_model().objects.create(email='naveen@example.com')
+            # Uncommitted, must be neither served from nor stored in the cache.
+            self.assertEqual(len(todos_utils.fetch_all_users()), 2)
+            transaction.set_rollback(True)
+        self.assertEqual(len(todos_utils.fetch_all_users()), 1)
+        self.assertEqual(todos_utils.fetch_all_users.cache_info(), CacheInfo(hits=1, misses=1))
+
+    def test_stats_endpoint(self):
+        todos_utils.fetch_all_users()
+        todos_utils.fetch_all_users()
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(email='admin@example.com', is_staff=True))
+        response = client.get(reverse('todos:report-cache'))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'hits': 1, 'misses': 1}, response.json()['todos.utils.fetch_all_users'])
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from todos.models import Todo, UserTodoStats
+
+
+class UserTodoStatsTest(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(email='stats@example.com')
+        self.other_user = get_user_model().objects.create(email='other@example.com')
+
+    def assertStats(self, user, completed, pending):
+        stats = UserTodoStats.objects.get(user=user)
+        self.assertEqual((stats.completed_count, stats.pending_count), (completed, pending))
+
+    def test_create_update_and_delete(self):
+        todo = Todo.objects.create(user=self.user, name='TODO')
+        self.assertStats(self.user, 0, 1)
+
+        todo.done = True
+        todo.save()
+        self.assertStats(self.user, 1, 0)
+
+        todo = Todo.objects.get(pk=todo.pk)
+        todo.user = self.other_user
+        todo.save()
+        self.assertStats(self.user, 0, 0)
+        self.assertStats(self.other_user, 1, 0)
+
+        todo.delete()
+        self.assertStats(self.other_user, 0, 0)
+
+    def test_bulk_operations(self):
+        Todo.objects.bulk_create([Todo(user=self.user, name='TODO', done=index < 2) for index in range(5)])
+        self.assertStats(self.user, 2, 3)
+
+        Todo.objects.filter(user=self.user, done=False).update(done=True)
+        self.assertStats(self.user, 5, 0)
+
+        todos = list(Todo.objects.filter(user=self.user)[:2])
+        for todo in todos:
+            todo.user = self.other_user
+        Todo.objects.bulk_update(todos, ['user'])
+        self.assertStats(self.user, 3, 0)
+        self.assertStats(self.other_user, 2, 0)
+
+        Todo.objects.filter(user=self.user).delete()
+        self.assertStats(self.user, 0, 0)
+
+    def test_rebuild_command_fixes_drift(self):
+        Todo.objects.bulk_create([Todo(user=self.user, name='TODO', done=index < 2) for index in range(5)])
+        UserTodoStats.objects.filter(user=self.user).update(completed_count=9)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_todo_stats', check=True, stdout=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_todo_stats', stdout=out)
+        self.assertIn('1 user(s) with drifted todo stats.', out.getvalue())
+        self.assertStats(self.user, 2, 3)
+        call_command('rebuild_todo_stats', check=True, stdout=StringIO())
@@ -1,8 +1,14 @@
+import datetime
+
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import connection
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-from todoapp.todos import utils as todos_utils
+from projects.models import Project, ProjectMember
+from todoapp.testing import FastFixturesTestMixin
+from todos import utils as todos_utils
+from todos.models import Todo
 
 
 class TestSetupMixin(object):
@@ -11,8 +17,8 @@ class TestSetupMixin(object):
         settings.DEBUG = True  # For using connection.queries.
 
 
-class ORMUtilTest(TestSetupMixin, TestCase):
-    fixtures = ['fixtures/01_data_dump.json', ]
+class ORMUtilTest(TestSetupMixin, FastFixturesTestMixin, TestCase):
+    fast_fixtures = ['fixtures/01_data_dump.json', ]
 
     def test_fetch_all_users(self):
         expected_data = [
@@ -1578,5 +1584,85 @@ class ORMUtilTest(TestSetupMixin, TestCase):
             expected_data
         )
 
+    def test_todo_stats_query_count_independent_of_user_count(self):
+        User = get_user_model()
+        for index in range(20):
+            user = User.objects.create(email='stats.user{}@example.com'.format(index))
+            Todo.objects.bulk_create([Todo(user=user, name='TODO', done=bool(index % 2)) for _ in range(3)])
+
+        with self.assertNumQueries(1):
+            data = todos_utils.fetch_users_todo_stats()
+        self.assertEqual(len(data), 26)
+        with self.assertNumQueries(1):
+            data = todos_utils.fetch_five_users_with_max_pending_todos()
+        self.assertEqual([user['pending_count'] for user in data], [22, 16, 15, 13, 10])
+        with self.assertNumQueries(1):
+            data = todos_utils.fetch_users_with_n_pending_todos(n=3)
+        self.assertEqual(len(data), 10)
+
+    def test_project_wise_report_query_count_independent_of_project_count(self):
+        User = get_user_model()
+        users = [User.objects.create(email='report.user{}@example.com'.format(index)) for index in range(5)]
+        for index in range(10):
+            project = Project.objects.create(name='Report project {}'.format(index), max_members=5)
+            ProjectMember.objects.bulk_create([
+                ProjectMember(project=project, member=user) for user in users[:index % 6]
+            ])
+
+        with self.assertNumQueries(2):
+            data = todos_utils.fetch_project_wise_report()
+        self.assertEqual(len(data), 21)
+        self.assertEqual([len(project['report']) for project in data[11:]], [index % 6 for index in range(10)])
+
+    def test_user_wise_project_status_keeps_users_without_projects(self):
+        get_user_model().objects.create(first_name='Idle', email='idle@example.com')
+        with self.assertNumQueries(1):
+            data = todos_utils.fetch_user_wise_project_status()
+        self.assertEqual(len(data), 7)
+        idle = next(user for user in data if user['email'] == 'idle@example.com')
+        self.assertEqual(
+            [idle['to_do_projects'], idle['in_progress_projects'], idle['completed_projects']], [[], [], []]
+        )
+        naveen = next(user for user in data if user['first_name'] == 'Naveen')
+        self.assertEqual(naveen['to_do_projects'], ['Project A', 'Project H', 'Project K'])
 
+    def test_iter_todo_list_with_user_details(self):
+        with self.assertNumQueries(1):
+            data = list(todos_utils.iter_todo_list_with_user_details(chunk_size=10))
+        self.assertEqual(len(data), 119)
+        self.assertCountEqual(data, todos_utils.fetch_all_todo_list_with_user_details())
 
+    def test_completed_todos_in_date_range_pages(self):
+        data = todos_utils.fetch_completed_todos_with_in_date_range('21-12-2021', '30-12-2021')
+        self.assertEqual(len(data), 24)
+        # 24 todos in pages of 5: five full or partial page reads, each a single query.
+        with self.assertNumQueries(5):
+            streamed = list(
+                todos_utils.iter_completed_todos_with_in_date_range('21-12-2021', '30-12-2021', page_size=5)
+            )
+        self.assertEqual(streamed, data)
+
+        last = Todo.objects.get(pk=data[9]['id'])
+        page = todos_utils.fetch_completed_todos_with_in_date_range(
+            '21-12-2021', '30-12-2021', cursor=(last.date_created, last.pk), limit=5
+        )
+        self.assertEqual(page, data[10:15])
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_completed_todos_in_date_range_uses_current_time_zone(self):
+        user = get_user_model().objects.get(pk=1)
+        # 26 Dec, 01:00 in Kolkata, still 25 Dec in UTC.
+        todo = Todo.objects.create(
+            user=user, name='Late night', done=True,
+            date_created=datetime.datetime(2021, 12, 25, 19, 30, tzinfo=datetime.timezone.utc)
+        )
+        ids = [row['id'] for row in todos_utils.fetch_completed_todos_with_in_date_range('26-12-2021', '27-12-2021')]
+        self.assertEqual(ids, [todo.pk, 18, 25, 35, 78, 87, 92])
+        ids = [row['id'] for row in todos_utils.fetch_completed_todos_with_in_date_range('25-12-2021', '26-12-2021')]
+        self.assertEqual(ids, [])
+
+    def test_utils_return_plain_types(self):
+        data = todos_utils.fetch_all_todo_list_with_user_details()
+        self.assertIs(type(data), list)
+        self.assertIs(type(data[0]), dict)
+        self.assertIs(type(data[0]['creator']), dict)
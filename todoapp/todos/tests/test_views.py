@@ -0,0 +1,398 @@
+import datetime
+import json
+import os
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from projects.models import Project, ProjectMember
+from todoapp.testing import QueryBudgetTestMixin
+from todos.columnar import read_columnar
+from todos.models import Todo, TodoTombstone, UserTodoStats
+from todos.sync import encode_watermark
+from users.authentication import token_cache
+
+
+class TodoAPIViewSetTestCase(QueryBudgetTestMixin, APITestCase):
+    url = reverse('todos:todos-list')
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(email='todo@example.com')
+        self.client.force_authenticate(self.user)
+
+    def create_todos(self, count):
+        # Several todos share a timestamp so the id tie-breaker is exercised.
+        start = datetime.datetime(2021, 12, 1, tzinfo=datetime.timezone.utc)
+        return Todo.objects.bulk_create([
+            Todo(
+                user=self.user, name='TODO - {}'.format(index),
+                date_created=start + datetime.timedelta(hours=index // 3),
+            )
+            for index in range(count)
+        ])
+
+    def test_create_and_retrieve(self):
+        response = self.client.post(self.url, {'name': 'Write tests', 'done': True})
+        self.assertEqual(201, response.status_code)
+        self.assertEqual({'name', 'done', 'date_created'}, set(response.json()))
+
+        todo = Todo.objects.get(user=self.user)
+        self.assertIsNotNone(todo.date_completed)
+        response = self.client.get(reverse('todos:todos-detail', args=[todo.pk]))
+        self.assertEqual('Write tests', response.json()['name'])
+
+    def test_list_is_scoped_to_the_user(self):
+        other_user = get_user_model().objects.create(email='other@example.com')
+        Todo.objects.create(user=other_user, name='Not mine')
+        response = self.client.get(self.url)
+        self.assertEqual([], response.json()['results'])
+
+    def test_keyset_pages(self):
+        todos = self.create_todos(25)
+        names, url, page_queries = [], self.url + '?page_size=10', []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            page_queries.append(len(queries))
+            names.extend(todo['name'] for todo in response.json()['results'])
+            url = response.json()['next']
+        self.assertEqual([todo.name for todo in todos], names)
+        self.assertEqual(3, len(page_queries))
+        self.assertEqual(len(set(page_queries)), 1)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(404, response.status_code)
+
+    def test_list_conditional_get(self):
+        todos = self.create_todos(3)
+        # Written a while ago, so that the writes below get a higher version.
+        Todo.objects.update(version=1)
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertNotEqual(etag, self.client.get(self.url, {'page_size': 2})['ETag'])
+
+        todos[1].done = True
+        todos[1].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        etag = response['ETag']
+        todos[2].delete()
+        self.assertEqual(200, self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+    def test_list_etag_changes_on_writes_with_a_lower_version(self):
+        todos = self.create_todos(2)
+        # A transaction started earlier (lower txid on PostgreSQL) may commit after a later one.
+        Todo.objects.filter(pk=todos[0].pk).update(version=200)
+        etag = self.client.get(self.url)['ETag']
+        Todo.objects.filter(pk=todos[1].pk).update(name='Renamed', version=100)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertIn('Renamed', [todo['name'] for todo in response.json()['results']])
+        self.assertEqual(304, self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code)
+
+    def test_detail_conditional_get(self):
+        todo = self.create_todos(1)[0]
+        Todo.objects.update(version=1)
+        url = reverse('todos:todos-detail', args=[todo.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(304, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+        self.client.patch(url, {'name': 'Renamed'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('Renamed', response.json()['name'])
+        todo.delete()
+        self.assertEqual(404, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+
+class TodoBulkAPITestCase(QueryBudgetTestMixin, APITestCase):
+    url = reverse('todos:todos-bulk')
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(email='todo@example.com')
+        self.client.force_authenticate(self.user)
+
+    def test_create(self):
+        response = self.client.post(self.url, {'create': [
+            {'name': 'Pending'}, {'name': 'Done', 'done': True}, {'done': True},
+        ]})
+        self.assertEqual(200, response.status_code)
+        created, invalid = response.json()['create'][:2], response.json()['create'][2]
+        self.assertEqual([('Pending', False), ('Done', True)], [(todo['name'], todo['done']) for todo in created])
+        self.assertIn('name', invalid['errors'])
+
+        todos = {todo.pk: todo for todo in Todo.objects.filter(user=self.user)}
+        self.assertEqual({todo['id'] for todo in created}, set(todos))
+        self.assertIsNone(todos[created[0]['id']].date_completed)
+        self.assertIsNotNone(todos[created[1]['id']].date_completed)
+        self.assertEqual((1, 1), (self.user.todo_stats.completed_count, self.user.todo_stats.pending_count))
+
+    def test_update(self):
+        stamped = datetime.datetime(2021, 12, 1, tzinfo=datetime.timezone.utc)
+        pending, done, completed = Todo.objects.bulk_create([
+            Todo(user=self.user, name='Pending'),
+            Todo(user=self.user, name='Done', done=True, date_completed=stamped),
+            Todo(user=self.user, name='Completed', done=True, date_completed=stamped),
+        ])
+        not_mine = Todo.objects.create(user=get_user_model().objects.create(email='other@example.com'), name='Not mine')
+
+        response = self.client.post(self.url, {'update': [
+            {'id': pending.pk, 'done': True}, {'id': done.pk, 'done': True}, {'id': completed.pk, 'done': False},
+            {'id': not_mine.pk, 'done': True}, {'id': pending.pk},
+        ]})
+        self.assertEqual(200, response.status_code)
+        results = response.json()['update']
+        self.assertEqual(
+            ['Todo updated Successfully'] * 3 + ['Todo does not exist'], [result['status'] for result in results[:4]]
+        )
+        self.assertIn('done', results[4]['errors'])
+
+        pending, done, completed, not_mine = (
+            Todo.objects.get(pk=todo.pk) for todo in (pending, done, completed, not_mine)
+        )
+        self.assertEqual((True, True, False, False), (pending.done, done.done, completed.done, not_mine.done))
+        self.assertIsNotNone(pending.date_completed)
+        self.assertEqual(stamped, done.date_completed)
+        self.assertIsNone(completed.date_completed)
+        self.assertEqual((2, 1), (self.user.todo_stats.completed_count, self.user.todo_stats.pending_count))
+
+    def test_query_count_independent_of_batch_size(self):
+        query_counts = []
+        for size in (1, 50):
+            todos = Todo.objects.bulk_create([Todo(user=self.user, name='TODO') for _ in range(size)])
+            payload = {
+                'create': [{'name': 'New', 'done': True} for _ in range(size)],
+                'update': [{'id': todo.pk, 'done': True} for todo in todos],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(200, self.client.post(self.url, payload).status_code)
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_requires_items(self):
+        self.assertEqual(400, self.client.post(self.url, {}).status_code)
+        response = self.client.post(self.url, {'create': [{'name': 'TODO'}] * 1001})
+        self.assertEqual(400, response.status_code)
+
+
+class TodoSyncAPITestCase(QueryBudgetTestMixin, APITestCase):
+    url = reverse('todos:todos-sync')
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(email='todo@example.com')
+        self.client.force_authenticate(self.user)
+        self.todos = Todo.objects.bulk_create([
+            Todo(user=self.user, name='TODO - {}'.format(index)) for index in range(3)
+        ])
+        # Written before the first sync.
+        Todo.objects.update(version=1)
+
+    def sync(self, since=None):
+        response = self.client.get(self.url, {'since': since} if since else {})
+        self.assertEqual(200, response.status_code)
+        return response.json()
+
+    def test_full_then_delta(self):
+        data = self.sync()
+        self.assertEqual([todo.pk for todo in self.todos], [todo['id'] for todo in data['changed']])
+        self.assertEqual([], data['deleted'])
+
+        first, second, third = self.todos
+        third_id = third.pk
+        first.done = True
+        first.save()
+        Todo.objects.filter(pk=second.pk).update(name='Renamed')
+        third.delete()
+        created = Todo.objects.create(user=self.user, name='New')
+        other_user = get_user_model().objects.create(email='other@example.com')
+        Todo.objects.create(user=other_user, name='Not mine').delete()
+
+        delta = self.sync(data['watermark'])
+        self.assertEqual(
+            [(first.pk, True), (second.pk, False), (created.pk, False)],
+            [(todo['id'], todo['done']) for todo in delta['changed']],
+        )
+        self.assertEqual('Renamed', delta['changed'][1]['name'])
+        self.assertEqual([third_id], delta['deleted'])
+
+    def test_moved_todos_are_deleted_for_previous_owner(self):
+        watermark = self.sync()['watermark']
+        other_user = get_user_model().objects.create(email='other@example.com')
+        first, second, third = self.todos
+        first.user = other_user
+        first.save()
+        # Previous owner unknown to the instance.
+        second = Todo.objects.only('name').get(pk=second.pk)
+        second.user = other_user
+        second.save()
+        Todo.objects.filter(pk=third.pk).update(user=self.user, name='Kept')
+        fourth = Todo.objects.create(user=self.user, name='Fourth')
+        Todo.objects.filter(pk=fourth.pk).update(user=other_user)
+        self.assertEqual(1, UserTodoStats.objects.get(user=self.user).pending_count)
+
+        delta = self.sync(watermark)
+        self.assertEqual([third.pk], [todo['id'] for todo in delta['changed']])
+        self.assertEqual([first.pk, second.pk, fourth.pk], sorted(delta['deleted']))
+        self.client.force_authenticate(other_user)
+        self.assertEqual([first.pk, second.pk, fourth.pk], sorted(todo['id'] for todo in self.sync()['changed']))
+
+    def test_bulk_writes_are_synced(self):
+        watermark = self.sync()['watermark']
+        self.client.post(reverse('todos:todos-bulk'), {
+            'create': [{'name': 'Bulk'}], 'update': [{'id': self.todos[0].pk, 'done': True}],
+        })
+        changed = self.sync(watermark)['changed']
+        self.assertEqual([self.todos[0].pk, 'Bulk'], [changed[0]['id'], changed[1]['name']])
+
+    def test_invalid_and_expired_watermarks(self):
+        response = self.client.get(self.url, {'since': 'garbage'})
+        self.assertEqual(400, response.status_code)
+        expired = encode_watermark(1, timezone.now() - datetime.timedelta(days=settings.TODO_SYNC_TOMBSTONE_DAYS + 1))
+        response = self.client.get(self.url, {'since': expired})
+        self.assertEqual(410, response.status_code)
+
+    def test_purge_tombstones(self):
+        purged_id, kept_id = self.todos[0].pk, self.todos[1].pk
+        self.todos[0].delete()
+        self.todos[1].delete()
+        TodoTombstone.objects.filter(todo_id=purged_id).update(
+            date_deleted=timezone.now() - datetime.timedelta(days=settings.TODO_SYNC_TOMBSTONE_DAYS + 1)
+        )
+        call_command('purge_todo_tombstones', stdout=StringIO())
+        self.assertEqual([kept_id], list(TodoTombstone.objects.values_list('todo_id', flat=True)))
+
+
+class AsyncTodoAPIViewTestCase(QueryBudgetTestMixin, TestCase):
+    url = reverse('todos:async-todos-list')
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create(email='todo@example.com')
+        self.headers = {'Authorization': 'Token ' + Token.objects.create(user=self.user).key}
+        self.todos = Todo.objects.bulk_create([
+            Todo(user=self.user, name='TODO - {}'.format(index)) for index in range(5)
+        ])
+
+    async def test_list_matches_the_sync_view(self):
+        sync_response = await self.async_client.get(reverse('todos:todos-list') + '?page_size=2', headers=self.headers)
+        response = await self.async_client.get(self.url + '?page_size=2', headers=self.headers)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(sync_response.json()['results'], response.json()['results'])
+
+        names, url = [], self.url + '?page_size=2'
+        while url:
+            response = await self.async_client.get(url, headers=self.headers)
+            names.extend(todo['name'] for todo in response.json()['results'])
+            url = response.json()['next']
+        self.assertEqual([todo.name for todo in self.todos], names)
+
+    async def test_queries_are_counted(self):
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertQueryCount(response, 2)
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertQueryCount(response, 1)
+
+    async def test_detail_is_scoped_to_the_user(self):
+        response = await self.async_client.get(
+            reverse('todos:async-todos-detail', args=[self.todos[0].pk]), headers=self.headers
+        )
+        self.assertEqual({'name': 'TODO - 0', 'done': False}, {k: response.json()[k] for k in ('name', 'done')})
+
+        other_user = await get_user_model().objects.acreate(email='other@example.com')
+        todo = await Todo.objects.acreate(user=other_user, name='Not mine')
+        response = await self.async_client.get(
+            reverse('todos:async-todos-detail', args=[todo.pk]), headers=self.headers
+        )
+        self.assertEqual(404, response.status_code)
+
+    async def test_requires_a_token(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(401, response.status_code)
+        self.assertEqual('Token', response['WWW-Authenticate'])
+        response = await self.async_client.get(self.url, headers={'Authorization': 'Token wrong'})
+        self.assertEqual(401, response.status_code)
+
+
+class TodoExportAPIViewTestCase(APITestCase):
+    url = reverse('todos:export')
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create(email='admin@example.com', first_name='Admin', is_staff=True)
+        Todo.objects.bulk_create([Todo(user=self.admin, name='TODO - {}'.format(index)) for index in range(3)])
+
+    def test_streams_ndjson(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/x-ndjson', response['Content-Type'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        todos = [json.loads(line) for line in lines]
+        self.assertEqual(['TODO - 0', 'TODO - 1', 'TODO - 2'], [todo['name'] for todo in todos])
+        self.assertEqual({'first_name': 'Admin', 'last_name': '', 'email': 'admin@example.com'}, todos[0]['creator'])
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(get_user_model().objects.create(email='user@example.com'))
+        response = self.client.get(self.url)
+        self.assertEqual(403, response.status_code)
+
+
+class TodoColumnarExportTestCase(APITestCase):
+    url = reverse('todos:export-columnar')
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create(email='admin@example.com', is_staff=True)
+        self.user = get_user_model().objects.create(email='user@example.com')
+        Todo.objects.bulk_create([
+            Todo(user=self.admin, name='TODO - 1'),
+            Todo(user=self.user, name='Tâche - 2', done=True, date_completed=timezone.now()),
+            Todo(user=self.admin, name=''),
+        ])
+        project = Project.objects.create(name='Project A', max_members=2)
+        ProjectMember.objects.bulk_create([
+            ProjectMember(project=project, member=self.admin), ProjectMember(project=project, member=self.user)
+        ])
+
+    def test_streams_both_tables(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        chunks = list(read_columnar(BytesIO(b''.join(response.streaming_content))))
+        self.assertEqual(['todos', 'project_members'], [name for name, _ in chunks])
+
+        todos = chunks[0][1]
+        expected = Todo.objects.order_by('id')
+        self.assertEqual([todo.id for todo in expected], todos['id'])
+        self.assertEqual([self.admin.pk, self.user.pk, self.admin.pk], todos['user'])
+        self.assertEqual(['TODO - 1', 'Tâche - 2', ''], todos['name'])
+        self.assertEqual([False, True, False], todos['done'])
+        self.assertEqual([None, expected[1].date_completed], [
+            None if value is None else datetime.datetime.fromtimestamp(value / 10 ** 6, datetime.timezone.utc)
+            for value in todos['date_completed'][:2]
+        ])
+        self.assertEqual([self.admin.pk, self.user.pk], chunks[1][1]['member'])
+
+    def test_command_writes_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'todos.todocol')
+            call_command('export_todos_columnar', path, chunk_size=2, stdout=StringIO())
+            with open(path, 'rb') as stream:
+                chunks = [(name, len(columns['id'])) for name, columns in read_columnar(stream)]
+        self.assertEqual([('todos', 2), ('todos', 1), ('project_members', 2)], chunks)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(403, response.status_code)
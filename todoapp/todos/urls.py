@@ -1,5 +1,8 @@
 from django.urls import path
-from todos.views import TodoAPIViewSet
+from todos.views import (
+    AsyncTodoDetailAPIView, AsyncTodoListAPIView, ReportCacheStatsAPIView, TodoAPIViewSet, TodoColumnarExportAPIView,
+    TodoExportAPIView
+)
 
 app_name = 'todos'
 
@@ -11,4 +14,10 @@ router = routers.SimpleRouter()
 
 router.register(r'todos', TodoAPIViewSet, 'todos')
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('export/', TodoExportAPIView.as_view(), name='export'),
+    path('export/columnar/', TodoColumnarExportAPIView.as_view(), name='export-columnar'),
+    path('report-cache/', ReportCacheStatsAPIView.as_view(), name='report-cache'),
+    path('async/todos/', AsyncTodoListAPIView.as_view(), name='async-todos-list'),
+    path('async/todos/<int:pk>/', AsyncTodoDetailAPIView.as_view(), name='async-todos-detail'),
+] + router.urls
@@ -1,4 +1,55 @@
-import json
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connections
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Coalesce
+
+from projects.models import Project, ProjectMember
+from todoapp.report_cache import cached_report
+from todoapp.routers import read_from_replica, replica_or_primary
+from todos.models import Todo
+from todos.serializers import (
+    CompletedTodoSerializer, ProjectDetailSerializer, ProjectReportSerializer, ProjectSummarySerializer,
+    TodoWithCreatorSerializer, UserPendingTodoSerializer, UserProjectStatusSerializer, UserSerializer,
+    UserTodoStatsSerializer
+)
+
+EXPORT_CHUNK_SIZE = 2000
+DATE_RANGE_FORMAT = '%d-%m-%Y'
+DATE_RANGE_PAGE_SIZE = 1000
+
+# fetch_user_wise_project_status buckets, by project status.
+PROJECT_STATUS_FIELDS = {
+    Project.TO_BE_STARTED: 'to_do_projects',
+    Project.IN_PROGRESS: 'in_progress_projects',
+    Project.COMPLETED: 'completed_projects',
+}
+# fetch_user_wise_project_status order: most completed projects first, then by the newest project joined (users
+# without projects last), then newest user first.
+USER_PROJECT_STATUS_ORDERING = ('-completed_count', F('newest_project_id').asc(nulls_last=True), '-id')
+
+# The fetch_* report utils are read-only, they read from the replica when one is configured (todoapp/routers.py).
+# Their results are cached until one of the models they read is written (todoapp/report_cache.py).
+
+
+def users_with_todo_stats():
+    """
+    Shared aggregation for the todo stats utils.
+    Annotates every user with ``completed_count`` & ``pending_count`` read from the UserTodoStats counters
+    (one LEFT JOIN, O(users) rows instead of O(todos)), so callers can order, slice or filter on the counts
+    without issuing a query per user.
+    :return: QuerySet - Users annotated with completed_count & pending_count
+    """
+    return get_user_model().objects.annotate(
+        completed_count=Coalesce('todo_stats__completed_count', 0),
+        pending_count=Coalesce('todo_stats__pending_count', 0),
+    )
+
+
 # Add code to this util to return all users list in specified format.
 # [ {
 #   "id": 1,
@@ -13,15 +64,17 @@ import json
 #   "email": "gurpreet.singh@joshtechnologygroup.com"
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
 
+@cached_report(settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_all_users():
     """
     Util to fetch given user's tod list
     :return: list of dicts - List of users data
     """
-    # Write your code here
-    pass
+    serializer = UserSerializer(get_user_model().objects.order_by('id'), many=True)
+    return serializer.data
 
 
 # Add code to this util to  return all todos list (done/to do) along with user details in specified format.
@@ -48,14 +101,32 @@ def fetch_all_users():
 #   }
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
+@cached_report(Todo, settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_all_todo_list_with_user_details():
     """
     Util to fetch given user's tod list
     :return: list of dicts - List of todos
     """
-    # Write your code here
-    pass
+    serializer = TodoWithCreatorSerializer(Todo.objects.select_related('user'), many=True)
+    return serializer.data
+
+
+def iter_todo_list_with_user_details(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Streaming variant of fetch_all_todo_list_with_user_details.
+    Walks the todos with a server-side cursor (where the database supports it) and serializes them one at a time,
+    so memory stays bounded by ``chunk_size`` regardless of the table size.
+    :param chunk_size: integer - Rows fetched from the cursor per round trip
+    :return: generator of dicts - Todos in the fetch_all_todo_list_with_user_details format
+    """
+    serializer = TodoWithCreatorSerializer()
+    todos = Todo.objects.using(replica_or_primary(Todo)).select_related('user').order_by('id').iterator(
+        chunk_size=chunk_size
+    )
+    for todo in todos:
+        yield serializer.to_representation(todo)
 
 
 # Add code to this util to return all projects with following details in specified format.
@@ -74,14 +145,16 @@ def fetch_all_todo_list_with_user_details():
 #   "max_members": 4
 # }]
 # Note: use serializer for generating this format. use source for status in serializer field.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
+@cached_report(Project, ProjectMember)
+@read_from_replica()
 def fetch_projects_details():
     """
     Util to fetch all project details
     :return: list of dicts - List of project with details
     """
-    # Write your code here
-    pass
+    serializer = ProjectDetailSerializer(Project.objects.all(), many=True)
+    return serializer.data
 
 
 # Add code to this util to  return stats (done & to do count) of all users in specified format.
@@ -102,14 +175,16 @@ def fetch_projects_details():
 #   "pending_count": 0
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
+@cached_report(Todo, settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_users_todo_stats():
     """
     Util to fetch todos list stats of all users on platform
     :return: list of dicts -  List of users with stats
     """
-    # Write your code here
-    pass
+    serializer = UserTodoStatsSerializer(users_with_todo_stats(), many=True)
+    return serializer.data
 
 
 # Add code to this util to return top five users with maximum number of pending todos in specified format.
@@ -128,14 +203,17 @@ def fetch_users_todo_stats():
 #   "pending_count": 4
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
+@cached_report(Todo, settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_five_users_with_max_pending_todos():
     """
     Util to fetch top five user with maximum number of pending todos
     :return: list of dicts -  List of users
     """
-    # Write your code here
-    pass
+    users = users_with_todo_stats().order_by('-pending_count', 'id')[:5]
+    serializer = UserPendingTodoSerializer(users, many=True)
+    return serializer.data
 
 
 # Add code to this util to return users with given number of pending todos in specified format.
@@ -155,16 +233,19 @@ def fetch_five_users_with_max_pending_todos():
 #   "pending_count": 4
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
 # Hint : use annotation and aggregations
+@cached_report(Todo, settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_users_with_n_pending_todos(n):
     """
     Util to fetch top five user with maximum number of pending todos
     :param n: integer - count of pending todos
     :return: list of dicts -  List of users
     """
-    # Write your code here
-    pass
+    users = users_with_todo_stats().filter(pending_count=n)
+    serializer = UserPendingTodoSerializer(users, many=True)
+    return serializer.data
 
 
 # Add code to this util to return todos that were created in between given dates (add proper order too) and marked as
@@ -187,16 +268,60 @@ def fetch_users_with_n_pending_todos(n):
 #   "created_at": "5:30 PM, 02 Feb, 2021"
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
-def fetch_completed_todos_with_in_date_range(start, end):
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
+@cached_report(Todo, settings.AUTH_USER_MODEL)
+@read_from_replica()
+def fetch_completed_todos_with_in_date_range(start, end, cursor=None, limit=None):
     """
     Util to fetch todos that were created in between given dates and marked as done.
+    The range is half-open (``end`` excluded), see TodoQuerySet.created_between for the index friendly bounds. Pass the
+    ``(date_created, id)`` of the last todo already read as ``cursor`` (along with ``limit``) to read the range a
+    page at a time, or use iter_completed_todos_with_in_date_range.
     :param start: string - Start date e.g. (12-01-2021)
     :param end: string - End date e.g. (12-02-2021)
+    :param cursor: tuple - (date_created, id) of the last todo already read, start of the range when None
+    :param limit: integer - Maximum number of todos returned, whole range when None
     :return: list of dicts - List of todos
     """
-    # Write your code here
-    pass
+    serializer = CompletedTodoSerializer(completed_todos_with_in_date_range(start, end, cursor)[:limit], many=True)
+    return serializer.data
+
+
+def completed_todos_with_in_date_range(start, end, cursor=None):
+    """
+    Queryset behind fetch_completed_todos_with_in_date_range, ordered on date_created, id.
+    :param start: string - Start date e.g. (12-01-2021)
+    :param end: string - End date e.g. (12-02-2021)
+    :param cursor: tuple - (date_created, id) of the last todo already read
+    :return: QuerySet - Completed todos created within the range
+    """
+    start, end = (datetime.datetime.strptime(day, DATE_RANGE_FORMAT).date() for day in (start, end))
+    todos = Todo.objects.filter(done=True).created_between(start, end)
+    if cursor is not None:
+        todos = todos.seek(*cursor)
+    return todos.select_related('user').order_by('date_created', 'id')
+
+
+def iter_completed_todos_with_in_date_range(start, end, page_size=DATE_RANGE_PAGE_SIZE):
+    """
+    Streaming variant of fetch_completed_todos_with_in_date_range.
+    Reads the range in keyset pages of ``page_size`` todos (one index range scan per page, no OFFSET), so memory
+    stays bounded whatever the size of the range.
+    :param start: string - Start date e.g. (12-01-2021)
+    :param end: string - End date e.g. (12-02-2021)
+    :param page_size: integer - Todos fetched per query
+    :return: generator of dicts - Todos in the fetch_completed_todos_with_in_date_range format
+    """
+    serializer = CompletedTodoSerializer()
+    cursor = None
+    while True:
+        with read_from_replica():
+            page = list(completed_todos_with_in_date_range(start, end, cursor)[:page_size])
+        for todo in page:
+            yield serializer.to_representation(todo)
+        if len(page) < page_size:
+            return
+        cursor = (page[-1].date_created, page[-1].pk)
 
 
 # Add code to this util to return list of projects having members who have name either starting with A or ending with A
@@ -212,14 +337,16 @@ def fetch_completed_todos_with_in_date_range(start, end):
 #   "max_members": 3
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
+@cached_report(Project, ProjectMember, settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_project_with_member_name_start_or_end_with_a():
     """
     Util to fetch project details having members who have name either starting with A or ending with A.
     :return: list of dicts - List of project data
     """
-    # Write your code here
-    pass
+    serializer = ProjectSummarySerializer(Project.objects.with_member_name(startswith='a', endswith='a'), many=True)
+    return serializer.data
 
 
 # Add code to this util to return project wise todos stats per user in specified format.
@@ -262,14 +389,30 @@ def fetch_project_with_member_name_start_or_end_with_a():
 #   ]
 # }]
 # Note: use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
+@cached_report(Project, ProjectMember, Todo, settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_project_wise_report():
     """
     Util to fetch project wise todos pending &  count per user.
+    Two queries whatever the number of projects & members: the projects, then one row per membership carrying the
+    member's counts (read from the UserTodoStats counters, no GROUP BY over the todos). The rows are grouped under
+    their project in a single pass.
     :return: list of dicts - List of report data
     """
-    # Write your code here
-    pass
+    projects = list(Project.objects.order_by('id'))
+    members = users_with_todo_stats().annotate(report_project_id=F('projectmember__project_id')).filter(
+        report_project_id__isnull=False
+    ).only('first_name', 'last_name', 'email').order_by('first_name', 'last_name', 'id')
+
+    report_members = defaultdict(list)
+    for member in members:
+        report_members[member.report_project_id].append(member)
+    for project in projects:
+        project.report_members = report_members.get(project.pk, [])
+
+    serializer = ProjectReportSerializer(projects, many=True)
+    return serializer.data
 
 
 # Add code to this util to return all users project stats in specified format.
@@ -294,13 +437,67 @@ def fetch_project_wise_report():
 #   }
 # }]
 # Note: Use serializer for generating this format.
-# use json.loads(json.dumps(serializer.data)) while returning data from this function for test cases to pass.
+# Serializers extend PlainModelSerializer, so serializer.data already is plain dicts & lists; return it as is.
 # Hint: Use subquery/aggregation for project data.
+@cached_report(Project, ProjectMember, settings.AUTH_USER_MODEL)
+@read_from_replica()
 def fetch_user_wise_project_status():
     """
-    Util to fetch user wise project statuses.
+    Util to fetch user wise project statuses, in USER_PROJECT_STATUS_ORDERING order.
+    One query: on PostgreSQL the names are bucketed (and the users ordered) by the database
+    (aggregate_project_names), elsewhere the memberships are fetched once and bucketed & ordered in Python
+    (group_project_names).
     :return: list of dicts - List of user project data
     """
-    # Write your code here
-    pass
+    users = get_user_model().objects.only('first_name', 'last_name', 'email')
+    if connections[users.db].vendor == 'postgresql':
+        users = aggregate_project_names(users)
+    else:
+        users = group_project_names(users)
+    serializer = UserProjectStatusSerializer(users, many=True)
+    return serializer.data
+
+
+def aggregate_project_names(users):
+    """
+    Annotates every user with the sorted names of its projects per status, one filtered ARRAY_AGG per status over
+    a single join (PostgreSQL only).
+    :param users: QuerySet - Users
+    :return: QuerySet - Users annotated with the PROJECT_STATUS_FIELDS lists, in USER_PROJECT_STATUS_ORDERING order
+    """
+    return users.annotate(
+        completed_count=Count('projects', filter=Q(projects__status=Project.COMPLETED)),
+        newest_project_id=Max('projects__id'),
+        **{
+            field: ArrayAgg('projects__name', filter=Q(projects__status=status), ordering='projects__name', default=[])
+            for status, field in PROJECT_STATUS_FIELDS.items()
+        }
+    ).order_by(*USER_PROJECT_STATUS_ORDERING)
+
+
+def group_project_names(users):
+    """
+    Portable counterpart of aggregate_project_names: fetches one row per membership (LEFT JOIN, so users without
+    projects are kept) and buckets the names in a single pass.
+    :param users: QuerySet - Users
+    :return: list - Users with the PROJECT_STATUS_FIELDS lists set, in USER_PROJECT_STATUS_ORDERING order
+    """
+    rows = users.annotate(
+        project_id=F('projects__id'), project_name=F('projects__name'), project_status=F('projects__status')
+    ).order_by('id', 'project_name')
+    grouped = {}
+    for row in rows:
+        user = grouped.get(row.pk)
+        if user is None:
+            user = grouped[row.pk] = row
+            user.newest_project_id = None
+            for field in PROJECT_STATUS_FIELDS.values():
+                setattr(user, field, [])
+        if row.project_name is not None:
+            getattr(user, PROJECT_STATUS_FIELDS[row.project_status]).append(row.project_name)
+            user.newest_project_id = max(user.newest_project_id or 0, row.project_id)
+    # Same order as USER_PROJECT_STATUS_ORDERING.
+    return sorted(grouped.values(), key=lambda user: (
+        -len(user.completed_projects), user.newest_project_id is None, user.newest_project_id or 0, -user.pk
+    ))
 
@@ -1,8 +1,79 @@
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from todoapp.async_views import AsyncAPIView
+from todoapp.report_cache import report_cache_info
+from todoapp.routers import read_from_replica
+from todos.columnar import iter_columnar_export
+from todos.models import Todo, TodoTombstone, UserTodoStats
+from todos.pagination import TodoKeysetPagination
+from todos.serializers import TodoBulkSerializer, TodoPatchSerializer, TodoSerializer, TodoSyncSerializer
+from todos.sync import decode_watermark, encode_watermark, watermark
+from todos.utils import iter_todo_list_with_user_details
+
+BULK_BATCH_SIZE = 1000
+
+TODO_UPDATED = 'Todo updated Successfully'
+TODO_NOT_FOUND = 'Todo does not exist'
+INVALID_WATERMARK = 'Invalid watermark'
+
+
+class WatermarkExpired(APIException):
+    status_code = 410
+    default_detail = 'Sync watermark expired, sync again without since.'
+    default_code = 'watermark_expired'
+
+
+def todo_list_etag(request, *args, **kwargs):
+    """
+    ETag of a TodoAPIViewSet list page, from the change counter of the user's todos (UserTodoStats.change_count),
+    bumped by every committed write and delete. One primary key lookup, whatever the number of todos.
+    """
+    change_count = UserTodoStats.objects.filter(user=request.user).values_list('change_count', flat=True).first()
+    return make_etag(request.user.pk, change_count, request.build_absolute_uri(), request.META.get('HTTP_ACCEPT'))
+
+
+def todo_detail_etag(request, pk, *args, **kwargs):
+    """
+    ETag of a TodoAPIViewSet todo, from its version. None (no validation) for unknown todos, which are 404s.
+    """
+    version = Todo.objects.filter(user=request.user, pk=pk).values_list('version', flat=True).first()
+    if version is None:
+        return None
+    return make_etag(pk, version, request.META.get('HTTP_ACCEPT'))
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
 
-class TodoAPIViewSet(ModelViewSet):
+class UserTodosMixin(object):
+
+    def get_queryset(self):
+        return Todo.objects.filter(user=self.request.user).order_by('date_created', 'id')
+
+
+class TodoAPIViewSet(UserTodosMixin, ModelViewSet):
     """
+        list & retrieve carry an ETag and answer 304 to a matching If-None-Match, validated from the user's todo
+        change counter (list) or the todo's change version (retrieve) before anything is fetched or serialized
+
         success response for create/update/get
         {
           "name": "",
@@ -10,16 +81,208 @@ class TodoAPIViewSet(ModelViewSet):
           "date_created": ""
         }
 
-        success response for list
-        [
-          {
-            "name": "",
-            "done": true/false,
-            "date_created": ""
-          }
+        success response for list (keyset paginated on date_created, id; follow "next" for the following page)
+        {
+          "next": "<url with cursor or null>",
+          "results": [
+            {
+              "name": "",
+              "done": true/false,
+              "date_created": ""
+            }
+          ]
+        }
+
+        bulk (POST todos/bulk/): creates & updates many todos in one transaction, with a fixed number of queries
+        Request
+        {
+          "create": [{"name": "", "done": true/false}, ...],
+          "update": [{"id": 1, "done": true/false}, ...]
+        }
+        Response, one result per requested item, in request order
+        {
+          "create": [{"id": 1, "name": "", "done": true/false, "date_created": ""} or {"errors": {...}}, ...],
+          "update": [{"id": 1, "status": "<status message>"} or {"errors": {...}}, ...]
+        }
+        following are the possible update status messages
+        case1: if the todo is updated - "Todo updated Successfully"
+        case2: if the id is not one of the user's todos - "Todo does not exist"
+
+        sync (GET todos/sync/?since=<watermark>): the todos changed & deleted since a previous sync, all todos when
+        since is omitted. Apply "changed" (upserts by id) before "deleted", then pass "watermark" as the next since.
+        A change may be sent again by the following sync. Watermarks older than TODO_SYNC_TOMBSTONE_DAYS are
+        refused with 410, sync again without since.
+        {
+          "watermark": "<opaque>",
+          "changed": [{"id": 1, "name": "", "done": true/false, "date_created": ""}],
+          "deleted": [2, 3]
+        }
+    """
+    serializer_class = TodoSerializer
+    pagination_class = TodoKeysetPagination
+
+    @read_from_replica()
+    @method_decorator(condition(etag_func=todo_list_etag))
+    def list(self, request, *args, **kwargs):
+        return super(TodoAPIViewSet, self).list(request, *args, **kwargs)
+
+    @method_decorator(condition(etag_func=todo_detail_etag))
+    def retrieve(self, request, *args, **kwargs):
+        return super(TodoAPIViewSet, self).retrieve(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request, *args, **kwargs):
+        since = self.get_since()
+        # Read from the primary: a replica's watermark does not match the primary's versions. Not through
+        # router.db_for_write(), which would pin the client to the primary as if it had written.
+        using = DEFAULT_DB_ALIAS
+        next_watermark = encode_watermark(watermark(using), timezone.now())
+
+        todos = self.get_queryset().using(using).order_by('id')
+        deleted = []
+        if since is not None:
+            todos = todos.filter(version__gte=since)
+            deleted = list(
+                TodoTombstone.objects.using(using).filter(user=request.user, version__gte=since)
+                .order_by('todo_id').values_list('todo_id', flat=True)
+            )
+        changed = TodoSyncSerializer(todos, many=True).data
+        return Response({'watermark': next_watermark, 'changed': changed, 'deleted': deleted})
+
+    def get_since(self):
+        """
+        :return: integer - Version of the ``since`` watermark, None for a full sync
+        """
+        token = self.request.query_params.get('since')
+        if not token:
+            return None
+        try:
+            version, issued_at = decode_watermark(token)
+        except ValueError:
+            raise ValidationError({'since': [INVALID_WATERMARK]})
+        expires_at = issued_at + datetime.timedelta(days=settings.TODO_SYNC_TOMBSTONE_DAYS).total_seconds()
+        if expires_at < timezone.now().timestamp():
+            raise WatermarkExpired()
+        return version
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        serializer = TodoBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        now = timezone.now()
+        with transaction.atomic():
+            created = self.bulk_create_todos(serializer.validated_data.get('create', []), now)
+            updated = self.bulk_update_todos(serializer.validated_data.get('update', []), now)
+        return Response({'create': created, 'update': updated})
+
+    def bulk_create_todos(self, items, now):
+        """
+        Inserts the valid items with a single bulk_create; date_completed of the done ones is stamped in the INSERT.
+        :return: list of dicts - Created todo or validation errors, per item
+        """
+        results, todos = [], []
+        for item in items:
+            serializer = self.get_serializer(data=item)
+            if not serializer.is_valid():
+                results.append({'errors': serializer.errors})
+                continue
+            todo = Todo(user=self.request.user, date_created=now, **serializer.validated_data)
+            todo.date_completed = now if todo.done else None
+            results.append(todo)
+            todos.append(todo)
+        Todo.objects.bulk_create(todos, batch_size=BULK_BATCH_SIZE)
+        return [
+            result if isinstance(result, dict) else dict(self.get_serializer(result).data, id=result.pk)
+            for result in results
+        ]
+
+    def bulk_update_todos(self, items, now):
+        """
+        Applies the valid ``{id, done}`` patches to the user's todos with a single bulk_update. date_completed is set
+        in the same UPDATE: kept (or stamped when missing) for done todos, cleared for the others.
+        :return: list of dicts - Update status or validation errors, per item
+        """
+        patches = [TodoPatchSerializer(data=item) for item in items]
+        done_by_id = {patch.validated_data['id']: patch.validated_data['done'] for patch in patches if patch.is_valid()}
+        existing = set(self.get_queryset().filter(pk__in=done_by_id).values_list('pk', flat=True))
+
+        todos = [
+            Todo(
+                pk=pk, user=self.request.user, done=done,
+                date_completed=Coalesce(F('date_completed'), Value(now)) if done else None,
+            )
+            for pk, done in done_by_id.items() if pk in existing
         ]
+        Todo.objects.bulk_update(todos, ['done', 'date_completed'], batch_size=BULK_BATCH_SIZE)
+
+        results = []
+        for patch in patches:
+            if patch.errors:
+                results.append({'errors': patch.errors})
+            else:
+                pk = patch.validated_data['id']
+                results.append({'id': pk, 'status': TODO_UPDATED if pk in existing else TODO_NOT_FOUND})
+        return results
+
+
+class TodoExportAPIView(APIView):
+    """
+        Streams every todo along with its creator as newline delimited JSON, one todo per line.
+        {"id": 1, "name": "", "status": "Done/To Do", "created_at": "", "creator": {...}}
     """
+    permission_classes = (IsAdminUser,)
 
+    def get(self, request, *args, **kwargs):
+        lines = (json.dumps(todo) + '\n' for todo in iter_todo_list_with_user_details())
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
 
 
+class TodoColumnarExportAPIView(APIView):
+    """
+        Streams the todos and project members in the columnar export format (see todos.columnar), for analytics.
+    """
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(iter_columnar_export(), content_type='application/octet-stream')
+        response['Content-Disposition'] = 'attachment; filename="todos.todocol"'
+        return response
+
+
+class ReportCacheStatsAPIView(APIView):
+    """
+        Hit & miss counts of the report cache in the worker process serving the request, by report util.
+        {"todos.utils.fetch_all_users": {"hits": 0, "misses": 0}, ...}
+    """
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        return Response({name: info._asdict() for name, info in report_cache_info().items()})
+
+
+class AsyncTodoListAPIView(UserTodosMixin, AsyncAPIView):
+    """
+        Async (ASGI) variant of TodoAPIViewSet list, same response.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        paginator = TodoKeysetPagination()
+        with read_from_replica():
+            page = await paginator.apaginate_queryset(self.get_queryset(), request, view=self)
+        return JsonResponse(paginator.get_paginated_data(TodoSerializer(page, many=True).data))
+
+
+class AsyncTodoDetailAPIView(UserTodosMixin, AsyncAPIView):
+    """
+        Async (ASGI) variant of TodoAPIViewSet retrieve, same response.
+    """
 
+    async def get(self, request, pk, *args, **kwargs):
+        try:
+            todo = await self.get_queryset().aget(pk=pk)
+        except Todo.DoesNotExist:
+            raise NotFound()
+        return JsonResponse(TodoSerializer(todo).data)
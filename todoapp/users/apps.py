@@ -6,3 +6,6 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     name = 'users'
     verbose_name = 'Basic user system for the TODOs application'
+
+    def ready(self):
+        from users import signals  # noqa: F401
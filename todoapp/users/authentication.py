@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+DEFAULTS = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'CACHE_ALIAS': None,
+}
+CACHE_KEY_PREFIX = 'auth-token:'
+
+
+def get_cache_setting(name):
+    return getattr(settings, 'TOKEN_AUTH_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class LRUCache(object):
+    """
+    Thread safe, size bounded, in-process LRU mapping with a per entry time to live.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = LRUCache(get_cache_setting('MAX_SIZE'), get_cache_setting('TTL'))
+
+
+def get_shared_cache():
+    alias = get_cache_setting('CACHE_ALIAS')
+    return caches[alias] if alias else None
+
+
+def invalidate_tokens(keys):
+    """
+    Drops the given token keys from both cache tiers.
+    Only this process' in-process tier can be reached, other workers drop theirs when the TTL runs out.
+    """
+    keys = list(keys)
+    for key in keys:
+        token_cache.delete(key)
+    shared_cache = get_shared_cache()
+    if shared_cache is not None and keys:
+        shared_cache.delete_many([CACHE_KEY_PREFIX + key for key in keys])
+
+
+def token_entry(token):
+    """
+    Plain data cached for a token and its user: the field values, not the model instances, which would otherwise be
+    shared (with their related object & permission caches) by every request and thread of the process.
+    :param token: Token - Token with its user loaded
+    :return: dict - Cache entry
+    """
+    return {
+        'db': token._state.db,
+        'token': {field.attname: getattr(token, field.attname) for field in token._meta.concrete_fields},
+        'user': {field.attname: getattr(token.user, field.attname) for field in token.user._meta.concrete_fields},
+    }
+
+
+def token_from_entry(model, entry):
+    """
+    :param model: class - Token model
+    :param entry: dict - Cache entry of token_entry
+    :return: Token - New Token & user instances, as loaded from the database
+    """
+    user_model = model._meta.get_field('user').related_model
+    user = _from_values(user_model, entry['db'], entry['user'])
+    token = _from_values(model, entry['db'], entry['token'])
+    token.user = user
+    return token
+
+
+def _from_values(model, db, values):
+    field_names = [field.attname for field in model._meta.concrete_fields]
+    return model.from_db(db, field_names, [values[name] for name in field_names])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication keeping token -> user in a bounded in-process LRU with TTL, optionally backed by a shared
+    Django cache (``settings.TOKEN_AUTH_CACHE['CACHE_ALIAS']``) as a second tier, so steady state requests run no
+    authentication query. Entries are invalidated when a token is deleted or its user is saved (e.g. deactivated),
+    see users/signals.py. The cache holds field values (token_entry), every request gets its own user instance.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = token_cache.get(key)
+        if entry is None:
+            shared_cache = get_shared_cache()
+            entry = shared_cache.get(CACHE_KEY_PREFIX + key) if shared_cache is not None else None
+            if entry is None:
+                user, token = super(CachedTokenAuthentication, self).authenticate_credentials(key)
+                entry = token_entry(token)
+                if shared_cache is not None:
+                    shared_cache.set(CACHE_KEY_PREFIX + key, entry, get_cache_setting('TTL'))
+            token_cache.set(key, entry)
+        return self.check_token(token_from_entry(self.get_model(), entry))
+
+    async def aauthenticate(self, request):
+        """
+        authenticate for async views (plain Django HttpRequest), using the async ORM and cache API.
+        """
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        model = self.get_model()
+        entry = token_cache.get(key)
+        if entry is None:
+            shared_cache = get_shared_cache()
+            entry = await shared_cache.aget(CACHE_KEY_PREFIX + key) if shared_cache is not None else None
+            if entry is None:
+                try:
+                    token = await model.objects.select_related('user').aget(key=key)
+                except model.DoesNotExist:
+                    raise exceptions.AuthenticationFailed(_('Invalid token.'))
+                entry = token_entry(token)
+                if shared_cache is not None:
+                    await shared_cache.aset(CACHE_KEY_PREFIX + key, entry, get_cache_setting('TTL'))
+            token_cache.set(key, entry)
+        return self.check_token(token_from_entry(model, entry))
+
+    def get_key(self, request):
+        """
+        Token key from the Authorization header, same parsing as TokenAuthentication.authenticate.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+    @staticmethod
+    def check_token(token):
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return (token.user, token)
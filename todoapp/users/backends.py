@@ -0,0 +1,82 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_backends, get_user_model, user_login_failed
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import PermissionDenied
+
+from users.hashers import arun_hashing, run_hashing, verify_password
+
+
+class HashingPoolModelBackend(ModelBackend):
+    """
+    ModelBackend running password verification (and the transparent rehash) in the bounded hashing pool.
+    Database access stays on the calling thread.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown users take as long as wrong passwords (ModelBackend does the same).
+            run_hashing(make_password, password)
+            return None
+
+        is_correct, needs_rehash = run_hashing(verify_password, password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if needs_rehash:
+            user.password = run_hashing(make_password, password)
+            user.save(update_fields=['password'])
+        return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        """
+        authenticate for async views: async ORM, with the hashing awaited on the pool instead of blocking a thread.
+        """
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            await arun_hashing(make_password, password)
+            return None
+
+        is_correct, needs_rehash = await arun_hashing(verify_password, password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if needs_rehash:
+            user.password = await arun_hashing(make_password, password)
+            await user.asave(update_fields=['password'])
+        return user
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    Async counterpart of django.contrib.auth.authenticate (Django 4.2 has none). Backends without an aauthenticate
+    method run in a thread.
+    """
+    for backend in get_backends():
+        backend_path = '{}.{}'.format(backend.__module__, type(backend).__name__)
+        try:
+            if hasattr(backend, 'aauthenticate'):
+                user = await backend.aauthenticate(request, **credentials)
+            else:
+                user = await sync_to_async(backend.authenticate)(request, **credentials)
+        except PermissionDenied:
+            # The backend says the user may not log in, don't try the others.
+            break
+        if user is not None:
+            user.backend = backend_path
+            return user
+    await sync_to_async(user_login_failed.send)(
+        sender=__name__, credentials={'username': credentials.get('username')}, request=request
+    )
+    return None
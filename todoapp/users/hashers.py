@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher, check_password
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Memory-hard scrypt hasher whose cost comes from settings (PASSWORD_SCRYPT_*).
+    Hashes made with other parameters are upgraded transparently on the next successful login (must_update).
+    """
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # scrypt needs ~128 * r * (N + p) bytes, leave headroom above OpenSSL's 32MiB default cap.
+        return 2 * 128 * self.block_size * (self.work_factor + self.parallelism)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    """
+    Process wide pool running password hashing off the request thread. Its size
+    (settings.PASSWORD_HASHING_WORKERS) caps how many hashes run at once, so login bursts queue up instead of
+    oversubscribing the CPUs. scrypt and PBKDF2 release the GIL, so the workers run in parallel.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix='password-hashing'
+            )
+    return _executor
+
+
+def run_hashing(func, *args):
+    return get_hashing_executor().submit(func, *args).result()
+
+
+async def arun_hashing(func, *args):
+    return await asyncio.wrap_future(get_hashing_executor().submit(func, *args))
+
+
+def verify_password(password, encoded):
+    """
+    Database free counterpart of ``user.check_password`` that can run in the hashing pool.
+    :return: tuple - (password is correct, stored hash should be upgraded)
+    """
+    rehash = []
+    is_correct = check_password(password, encoded, setter=rehash.append)
+    return is_correct, bool(rehash)
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:40
+
+from django.db import migrations
+import django.db.models.functions.text
+import todoapp.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=todoapp.indexes.PatternOpsIndex(django.db.models.functions.text.Upper('first_name'), name='user_first_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=todoapp.indexes.PatternOpsIndex(django.db.models.functions.text.Reverse(django.db.models.functions.text.Upper('last_name')), name='user_last_name_upper_rev_idx'),
+        ),
+    ]
@@ -4,27 +4,73 @@ from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
 from django.db import models
+from django.db.models.functions import Reverse, Upper
+from django.utils import timezone
+
+from todoapp.indexes import PatternOpsIndex
 
 
 class UserManager(BaseUserManager):
     """
-    Add manager methods here to create user and super user
+    Manager to create users and super users identified by their email.
     """
+    use_in_migrations = True
+
+    def _create_user(self, email, password, **extra_fields):
+        if not email:
+            raise ValueError('The given email must be set')
+        email = self.normalize_email(email)
+        user = self.model(email=email, **extra_fields)
+        user.set_password(password)
+        user.save(using=self._db)
+        return user
+
+    def create_user(self, email, password=None, **extra_fields):
+        extra_fields.setdefault('is_staff', False)
+        extra_fields.setdefault('is_superuser', False)
+        return self._create_user(email, password, **extra_fields)
+
+    def create_superuser(self, email, password, **extra_fields):
+        extra_fields.setdefault('is_staff', True)
+        extra_fields.setdefault('is_superuser', True)
+
+        if extra_fields.get('is_staff') is not True:
+            raise ValueError('Superuser must have is_staff=True.')
+        if extra_fields.get('is_superuser') is not True:
+            raise ValueError('Superuser must have is_superuser=True.')
 
+        return self._create_user(email, password, **extra_fields)
 
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
     """
-    Needed fields
-    - password (already inherited from AbstractBaseUser; encrypt password before saving to database)
-    - last_login (already inherited from AbstractBaseUser)
-    - is_superuser
-    - first_name (max_length=30)
-    - email (should be unique)
-    - is_staff
-    - date_joined (default should be time of object creation)
-    - last_name (max_length=150)
+    User of the TODOs application, identified by a unique email.
     """
+    first_name = models.CharField(max_length=30, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    email = models.EmailField(unique=True)
+    is_staff = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    date_joined = models.DateTimeField(default=timezone.now, null=True, blank=True)
 
     objects = UserManager()
 
+    USERNAME_FIELD = 'email'
+    EMAIL_FIELD = 'email'
+
+    class Meta:
+        indexes = [
+            # Case-insensitive prefix & suffix searches on full names (see ProjectQuerySet.with_member_name): a
+            # prefix of the first name, and a suffix of the last name, which is a prefix of the reversed last name.
+            PatternOpsIndex(Upper('first_name'), name='user_first_name_upper_idx'),
+            PatternOpsIndex(Reverse(Upper('last_name')), name='user_last_name_upper_rev_idx'),
+        ]
+
+    def __str__(self):
+        return self.email
+
+    def get_full_name(self):
+        return '{} {}'.format(self.first_name, self.last_name).strip()
+
+    def get_short_name(self):
+        return self.first_name
@@ -1,10 +1,62 @@
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
-from django.utils.translation import ugettext_lazy as _
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 
+LOGIN_FAILED = _('Unable to log in with provided credentials.')
 
-# Add your serializers
+
+class UserRegistrationSerializer(serializers.ModelSerializer):
+    """
+    Registers a user and responds with its details along with a fresh auth token.
+    """
+    password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+    confirm_password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+    token = serializers.SerializerMethodField()
+
+    class Meta:
+        model = get_user_model()
+        fields = ('first_name', 'last_name', 'email', 'date_joined', 'password', 'confirm_password', 'token')
+        read_only_fields = ('date_joined',)
+
+    def validate(self, attrs):
+        if attrs['password'] != attrs['confirm_password']:
+            raise serializers.ValidationError({'confirm_password': _('Passwords do not match.')})
+        return attrs
+
+    def create(self, validated_data):
+        validated_data.pop('confirm_password')
+        validated_data['password'] = make_password(validated_data['password'])
+        return super(UserRegistrationSerializer, self).create(validated_data)
+
+    def get_token(self, user):
+        token, _created = Token.objects.get_or_create(user=user)
+        return token.key
+
+
+class UserCredentialsSerializer(serializers.Serializer):
+    """
+    Email & password of a login attempt, checked for shape only.
+    """
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+
+
+class UserLoginSerializer(UserCredentialsSerializer):
+    """
+    Authenticates a user by email & password and responds with its auth token.
+    """
+
+    def validate(self, attrs):
+        user = authenticate(self.context.get('request'), username=attrs['email'], password=attrs['password'])
+        if user is None:
+            raise serializers.ValidationError(LOGIN_FAILED, code='authorization')
+        attrs['user'] = user
+        return attrs
+
+    def to_representation(self, instance):
+        token, _created = Token.objects.get_or_create(user=instance['user'])
+        return {'auth_token': token.key}
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.authentication import invalidate_tokens
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, using, **kwargs):
+    # Cached tokens carry the user, drop them so deactivation or permission changes apply right away.
+    if not created:
+        invalidate_tokens(Token.objects.using(using).filter(user=instance).values_list('key', flat=True))
@@ -1,13 +1,20 @@
 import json
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
+from todoapp.testing import FAST_PASSWORD_HASHERS, QueryBudgetTestMixin
+from users.authentication import CachedTokenAuthentication, LRUCache, token_cache
+from users.hashers import TunableScryptPasswordHasher
 
-class UserRegistrationAPIViewTestCase(APITestCase):
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class UserRegistrationAPIViewTestCase(QueryBudgetTestMixin, APITestCase):
     url = reverse("users:register")
 
     def test_invalid_password(self):
@@ -56,7 +63,8 @@ class UserRegistrationAPIViewTestCase(APITestCase):
         self.assertEqual(400, response.status_code)
 
 
-class UserLoginAPIViewTestCase(APITestCase):
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class UserLoginAPIViewTestCase(QueryBudgetTestMixin, APITestCase):
     url = reverse("users:login")
 
     def setUp(self):
@@ -77,3 +85,126 @@ class UserLoginAPIViewTestCase(APITestCase):
         self.assertEqual(200, response.status_code)
         self.assertTrue("auth_token" in json.loads(response.content))
 
+    def test_legacy_hash_is_upgraded_on_login(self):
+        self.user.password = make_password(self.password, hasher="pbkdf2_sha256")
+        self.user.save()
+        response = self.client.post(self.url, {"email": self.email, "password": self.password})
+        self.assertEqual(200, response.status_code)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("md5$"))
+        self.assertTrue(self.user.check_password(self.password))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class AsyncUserLoginAPIViewTestCase(QueryBudgetTestMixin, TestCase):
+    url = reverse("users:async-login")
+
+    def setUp(self):
+        self.email = "john@snow.com"
+        self.password = "you_know_nothing"
+        self.user = get_user_model().objects.create_user(self.email, self.password)
+
+    async def post(self, data):
+        return await self.async_client.post(self.url, json.dumps(data), content_type="application/json")
+
+    async def test_authentication_without_password(self):
+        response = await self.post({"email": self.email})
+        self.assertEqual(400, response.status_code)
+        self.assertIn("password", response.json())
+
+    async def test_authentication_with_wrong_password(self):
+        response = await self.post({"email": self.email, "password": "I_know"})
+        self.assertEqual(400, response.status_code)
+        self.assertIn("non_field_errors", response.json())
+
+    async def test_authentication_with_valid_data(self):
+        response = await self.post({"email": self.email, "password": self.password})
+        self.assertEqual(200, response.status_code)
+        token = await Token.objects.aget(user=self.user)
+        self.assertEqual({"auth_token": token.key}, response.json())
+
+    async def test_legacy_hash_is_upgraded_on_login(self):
+        self.user.password = make_password(self.password, hasher="pbkdf2_sha256")
+        await self.user.asave()
+        response = await self.post({"email": self.email, "password": self.password})
+        self.assertEqual(200, response.status_code)
+        await self.user.arefresh_from_db()
+        self.assertTrue(self.user.password.startswith("md5$"))
+
+    async def test_invalid_json(self):
+        response = await self.async_client.post(self.url, "{", content_type="application/json")
+        self.assertEqual(400, response.status_code)
+
+
+class TunableScryptPasswordHasherTestCase(TestCase):
+
+    @override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 4)
+    def test_cost_change_requires_rehash(self):
+        hasher = TunableScryptPasswordHasher()
+        encoded = hasher.encode("secret", hasher.salt())
+        self.assertTrue(hasher.verify("secret", encoded))
+        self.assertFalse(hasher.must_update(encoded))
+        with self.settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 5):
+            self.assertTrue(hasher.verify("secret", encoded))
+            self.assertTrue(hasher.must_update(encoded))
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    url = reverse("todos:todos-list")
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create(email="cached@token.com")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def test_steady_state_runs_no_auth_query(self):
+        # The list itself runs 2 queries (ETag validator + page).
+        with self.assertNumQueries(3):
+            self.assertEqual(200, self.client.get(self.url).status_code)
+        with self.assertNumQueries(2):
+            self.assertEqual(200, self.client.get(self.url).status_code)
+
+    def test_requests_get_their_own_user(self):
+        authentication = CachedTokenAuthentication()
+        first_user, first_token = authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            second_user, second_token = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(first_user, second_user)
+        self.assertIsNot(first_user, second_user)
+        self.assertIsNot(first_token, second_token)
+        self.assertIs(second_user, second_token.user)
+        self.assertEqual(self.user.email, second_user.email)
+
+    def test_deleted_token_is_rejected(self):
+        self.assertEqual(200, self.client.get(self.url).status_code)
+        self.token.delete()
+        self.assertEqual(401, self.client.get(self.url).status_code)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(200, self.client.get(self.url).status_code)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(401, self.client.get(self.url).status_code)
+
+    @override_settings(
+        CACHES={"shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        TOKEN_AUTH_CACHE={"CACHE_ALIAS": "shared"},
+    )
+    def test_shared_cache_tier(self):
+        self.assertEqual(200, self.client.get(self.url).status_code)
+        token_cache.clear()
+        with self.assertNumQueries(2):
+            self.assertEqual(200, self.client.get(self.url).status_code)
+
+    def test_lru_is_bounded(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((1, None, 3), (cache.get("a"), cache.get("b"), cache.get("c")))
+
+        expired = LRUCache(max_size=2, ttl=-1)
+        expired.set("a", 1)
+        self.assertIsNone(expired.get("a"))
@@ -1,9 +1,10 @@
 from django.urls import path
-from users.views import UserRegistrationAPIView, UserLoginAPIView
+from users.views import AsyncUserLoginAPIView, UserRegistrationAPIView, UserLoginAPIView
 
 app_name = 'users'
 
 urlpatterns = [
-    # path('users/', UserRegistrationAPIView.as_view(), name="register"),
-    # path('users/login/', UserLoginAPIView.as_view(), name="login"),
+    path('users/', UserRegistrationAPIView.as_view(), name="register"),
+    path('users/login/', UserLoginAPIView.as_view(), name="login"),
+    path('users/async/login/', AsyncUserLoginAPIView.as_view(), name="async-login"),
 ]
@@ -1,4 +1,18 @@
-class UserRegistrationAPIView():
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import CreateAPIView, GenericAPIView
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from todoapp.async_views import AsyncAPIView
+from users.backends import aauthenticate
+from users.serializers import LOGIN_FAILED, UserCredentialsSerializer, UserLoginSerializer, UserRegistrationSerializer
+
+
+class UserRegistrationAPIView(CreateAPIView):
     """
         success response format
          {
@@ -9,12 +23,43 @@ class UserRegistrationAPIView():
            "token"
          }
     """
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    serializer_class = UserRegistrationSerializer
 
 
-class UserLoginAPIView():
+class UserLoginAPIView(GenericAPIView):
     """
         success response format
          {
            auth_token: ""
          }
     """
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    serializer_class = UserLoginSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AsyncUserLoginAPIView(AsyncAPIView):
+    """
+        Async (ASGI) variant of UserLoginAPIView, same request & response.
+        Password hashing is awaited on the hashing pool, so a login holds no thread while it runs.
+    """
+    authentication_classes = ()
+    requires_authentication = False
+
+    async def post(self, request, *args, **kwargs):
+        serializer = UserCredentialsSerializer(data=self.get_data(request))
+        serializer.is_valid(raise_exception=True)
+        user = await aauthenticate(
+            request, username=serializer.validated_data['email'], password=serializer.validated_data['password']
+        )
+        if user is None:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [LOGIN_FAILED]}, code='authorization')
+        token, _created = await Token.objects.aget_or_create(user=user)
+        return JsonResponse({'auth_token': token.key})